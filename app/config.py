@@ -20,6 +20,94 @@ AZURE_SEARCH_KEY = os.getenv("AZURE_SEARCH_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 
+# 공유 상태 저장소 (멀티 워커 배포 시 sqlite 또는 redis 사용)
+# memory: 단일 워커 / sqlite: 같은 호스트의 여러 워커 / redis: 여러 호스트
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+STATE_SQLITE_PATH = os.getenv(
+    "STATE_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "state.db"),
+)
+STATE_REDIS_URL = os.getenv("STATE_REDIS_URL", "redis://localhost:6379/0")
+STATE_KEY_PREFIX = os.getenv("STATE_KEY_PREFIX", "handover:")
+
+# 임베딩 캐시 유지 시간 (초, 0이면 캐시 사용 안 함)
+EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+
+# Azure OpenAI 호출 제한 (배포별 분당 요청/토큰 한도)
+# 배포별로 다르면 AZURE_OPENAI_LIMITS='{"gpt-4o": {"rpm": 300, "tpm": 50000}}' 형태로 지정
+AZURE_OPENAI_RPM_LIMIT = int(os.getenv("AZURE_OPENAI_RPM_LIMIT", "300"))
+AZURE_OPENAI_TPM_LIMIT = int(os.getenv("AZURE_OPENAI_TPM_LIMIT", "50000"))
+AZURE_OPENAI_LIMITS = os.getenv("AZURE_OPENAI_LIMITS", "")
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "30"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+
+# 멀티턴 채팅 - 최근 메시지 N개만 원문으로 유지하고 이전 대화는 요약으로 압축
+CHAT_RECENT_MESSAGES = int(os.getenv("CHAT_RECENT_MESSAGES", "4"))
+CHAT_MESSAGE_MAX_CHARS = int(os.getenv("CHAT_MESSAGE_MAX_CHARS", "1500"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400"))
+CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", "86400"))
+
+# 대량 업로드 - 동시 처리 파일 수, 요청당 최대 파일 수, 파일당 최대 크기(바이트)
+BULK_UPLOAD_CONCURRENCY = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "4"))
+BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "1000"))
+BULK_UPLOAD_MAX_FILE_BYTES = int(os.getenv("BULK_UPLOAD_MAX_FILE_BYTES", str(50 * 1024 * 1024)))
+
+# 인덱싱 청크 크기 (글자 수)
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "2000"))
+CHUNK_MIN_CHARS = int(os.getenv("CHUNK_MIN_CHARS", "400"))
+
+# 벡터 인덱스 프로필 (새로 만드는 인덱스에 적용, 기존 인덱스는 migrate_index로 이전)
+# compression: none | scalar | binary, vector_type: single | half
+# 인덱스별로 다르면 SEARCH_INDEX_PROFILES='{"team-a": {"compression": "binary", "hnsw_m": 8}}'
+SEARCH_VECTOR_COMPRESSION = os.getenv("SEARCH_VECTOR_COMPRESSION", "none").lower()
+SEARCH_VECTOR_TYPE = os.getenv("SEARCH_VECTOR_TYPE", "single").lower()
+SEARCH_VECTOR_STORED = os.getenv("SEARCH_VECTOR_STORED", "true").lower() == "true"
+SEARCH_RESCORE_OVERSAMPLING = float(os.getenv("SEARCH_RESCORE_OVERSAMPLING", "4"))
+SEARCH_HNSW_M = int(os.getenv("SEARCH_HNSW_M", "4"))
+SEARCH_HNSW_EF_CONSTRUCTION = int(os.getenv("SEARCH_HNSW_EF_CONSTRUCTION", "400"))
+SEARCH_HNSW_EF_SEARCH = int(os.getenv("SEARCH_HNSW_EF_SEARCH", "500"))
+SEARCH_INDEX_PROFILES = os.getenv("SEARCH_INDEX_PROFILES", "")
+
+# 기본 검색 방식: keyword | vector | hybrid | auto (auto는 식별자/파일명 질의에 임베딩 생략)
+SEARCH_DEFAULT_MODE = os.getenv("SEARCH_DEFAULT_MODE", "auto").strip().lower()
+if SEARCH_DEFAULT_MODE not in ("keyword", "vector", "hybrid", "auto"):
+    # 오타 하나로 모든 채팅 요청이 실패하지 않도록 기동 시 한 번만 경고하고 auto 사용
+    print(f"⚠️  SEARCH_DEFAULT_MODE 값이 올바르지 않습니다 ({SEARCH_DEFAULT_MODE}) - auto 사용")
+    SEARCH_DEFAULT_MODE = "auto"
+
+# 요청 마감 시간(초) - 초과하거나 클라이언트 연결이 끊기면 진행 중인 작업을 멈춘다
+REQUEST_DEADLINE_CHAT = float(os.getenv("REQUEST_DEADLINE_CHAT", "60"))
+REQUEST_DEADLINE_ANALYZE = float(os.getenv("REQUEST_DEADLINE_ANALYZE", "120"))
+REQUEST_DEADLINE_UPLOAD = float(os.getenv("REQUEST_DEADLINE_UPLOAD", "300"))
+# 외부 호출 단계별 타임아웃(초) - 요청 마감까지 남은 시간이 더 짧으면 그 값을 쓴다
+TIMEOUT_EMBEDDING = float(os.getenv("TIMEOUT_EMBEDDING", "15"))
+TIMEOUT_SEARCH = float(os.getenv("TIMEOUT_SEARCH", "10"))
+TIMEOUT_LLM = float(os.getenv("TIMEOUT_LLM", "90"))
+TIMEOUT_EXTRACTION = float(os.getenv("TIMEOUT_EXTRACTION", "120"))
+TIMEOUT_BLOB = float(os.getenv("TIMEOUT_BLOB", "60"))
+
+# CPU 작업(텍스트 디코딩, 청킹) 프로세스 풀 - 0이면 풀 없이 요청 스레드에서 바로 실행
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+# 대기 + 실행 중 작업 수 상한 (넘으면 제출한 쪽이 자리가 날 때까지 기다림)
+CPU_POOL_MAX_PENDING = int(os.getenv("CPU_POOL_MAX_PENDING", str(max(1, CPU_POOL_WORKERS) * 4)))
+# 이 크기(바이트) 미만 입력은 프로세스 간 전달 없이 바로 실행
+CPU_POOL_INLINE_BYTES = int(os.getenv("CPU_POOL_INLINE_BYTES", "262144"))
+# 이 크기(바이트) 이상 바이트 입력은 공유 메모리로 전달 (복사/피클링 없이 작업 프로세스가 읽음)
+CPU_POOL_SHM_BYTES = int(os.getenv("CPU_POOL_SHM_BYTES", "1048576"))
+
+# 인덱스 내보내기/가져오기/복사 - 업로드 배치 크기(문서 수)와 동시에 보내는 배치 수
+INDEX_TRANSFER_BATCH_SIZE = int(os.getenv("INDEX_TRANSFER_BATCH_SIZE", "200"))
+INDEX_TRANSFER_CONCURRENCY = int(os.getenv("INDEX_TRANSFER_CONCURRENCY", "4"))
+# 관리자 API(/api/admin) 키 - X-Admin-Key 헤더가 일치해야 호출 가능 (비어 있으면 관리자 API 비활성화)
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
+# 응답 압축/정적 파일 - 이 크기(바이트) 이상인 API 응답은 gzip 압축
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+FRONTEND_DIST_DIR = os.getenv(
+    "FRONTEND_DIST_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "dist"),
+)
+
 # 환경변수 검증
 def validate_config():
     required = [
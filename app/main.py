@@ -1,14 +1,25 @@
 import sys
 import os
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
 
-from app.routers import chat, report, upload
-from app.config import validate_config
+from app.routers import admin, chat, report, upload
+from app.config import FRONTEND_DIST_DIR, GZIP_MIN_SIZE, validate_config
+from app.services.cpu_pool import shutdown_cpu_pool
+from app.services.warmup_service import get_warmup_status, is_ready, start_warmup
+from app.utils.json_response import FastJSONResponse
 from app.utils.logging_utils import safe_print
+from app.utils.static_files import (
+    IMMUTABLE_CACHE,
+    REVALIDATE_CACHE,
+    resolve_static_path,
+    static_file_response,
+)
 
 
 def _reconfigure_stdio_utf8() -> None:
@@ -21,12 +32,26 @@ def _reconfigure_stdio_utf8() -> None:
 
 _reconfigure_stdio_utf8()
 
-# 환경 변수 검증
-is_config_valid = validate_config()
-if not is_config_valid:
-    safe_print("⚠️  Warning: Some environment variables are missing. Some features may not work correctly.")
+is_config_valid = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global is_config_valid
+    # 환경 변수 검증 (import 시점이 아닌 서버 기동 시점에 실행)
+    is_config_valid = validate_config()
+    if not is_config_valid:
+        safe_print("⚠️  Warning: Some environment variables are missing. Some features may not work correctly.")
+    # Azure 클라이언트/연결 풀/인덱스 메타데이터 워밍업은 백그라운드에서 진행
+    start_warmup()
+    yield
+    shutdown_cpu_pool()
+
 
-app = FastAPI(title="RAG Chatbot API")
+app = FastAPI(title="RAG Chatbot API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# 큰 API 응답(추출 텍스트, 인수인계서 JSON 등) gzip 압축 - 이미 압축된 정적 파일은 건너뜀
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
 
 # CORS 미들웨어 설정 (가장 먼저 추가)
 app.add_middleware(
@@ -47,22 +72,42 @@ app.add_middleware(
     max_age=3600,
 )
 
-# Frontend 경로
+# Frontend 경로 - 빌드 결과물(frontend/dist)이 있으면 우선 사용
 FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
 
+def _frontend_root() -> str:
+    return FRONTEND_DIST_DIR if os.path.isfile(os.path.join(FRONTEND_DIST_DIR, "index.html")) else FRONTEND_DIR
+
 @app.get("/")
-def root():
-    return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
+def root(request: Request):
+    # index.html은 배포마다 바뀌므로 매번 ETag로 재검증
+    path = resolve_static_path(_frontend_root(), "index.html")
+    return static_file_response(request, path, REVALIDATE_CACHE)
+
+@app.get("/assets/{file_path:path}")
+def frontend_assets(file_path: str, request: Request):
+    # Vite 빌드 산출물은 파일명에 내용 해시가 포함되어 있어 영구 캐시 가능
+    path = resolve_static_path(os.path.join(_frontend_root(), "assets"), file_path)
+    return static_file_response(request, path, IMMUTABLE_CACHE)
 
 app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
 app.include_router(report.router, prefix="/api/report", tags=["Report"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 # Health check endpoint
 @app.get("/api/health")
 def health_check():
     return {"status": "ok", "config_valid": is_config_valid}
 
+# Readiness probe - 워밍업이 끝나기 전에는 503
+@app.get("/api/ready")
+def readiness_check():
+    status = get_warmup_status()
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up", **status})
+    return {"status": "ready", **status}
+
 @app.get("/test")
 def test():
     return {"message": "Backend is working!"}
\ No newline at end of file
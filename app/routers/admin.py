@@ -0,0 +1,121 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from app.config import ADMIN_API_KEY, INDEX_TRANSFER_BATCH_SIZE, INDEX_TRANSFER_CONCURRENCY
+from app.services.index_transfer_service import (
+    TransferInterrupted,
+    copy_index,
+    import_snapshot,
+    iter_snapshot_chunks,
+)
+from app.services.search_service import set_current_index
+from app.utils.logging_utils import log_exception, safe_print
+
+
+def _require_admin_key(x_admin_key: Optional[str] = Header(default=None)):
+    """X-Admin-Key 헤더가 ADMIN_API_KEY와 일치해야 한다 (키가 설정되지 않으면 모두 거부)."""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="관리자 API가 비활성화되어 있습니다 (ADMIN_API_KEY 미설정)")
+    # 비교 시간으로 키가 드러나지 않도록 상수 시간 비교
+    if not hmac.compare_digest((x_admin_key or "").encode("utf-8"), ADMIN_API_KEY.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="관리자 키가 올바르지 않습니다")
+
+
+router = APIRouter(dependencies=[Depends(_require_admin_key)])
+
+
+class CopyIndexRequest(BaseModel):
+    source: str
+    target: str
+    batch_size: Optional[int] = None
+    concurrency: Optional[int] = None
+    # 중단된 복사를 이어서 진행할 때 이전 응답의 continuation_token
+    continuation_token: Optional[str] = None
+    # 복사 후 target을 기본 인덱스로 선택
+    select: bool = False
+
+
+# ============================================================
+# 인덱스 내보내기/가져오기/복사 API
+# ============================================================
+
+@router.get("/indexes/{index_name}/export")
+async def export_index_endpoint(index_name: str):
+    """인덱스 스냅샷(gzip JSONL, 벡터 포함) 다운로드 - 읽는 대로 스트리밍"""
+    chunks = iter_snapshot_chunks(index_name)
+    try:
+        # 첫 조각(헤더 + 필드 확인)은 응답 전에 만들어 조회 불가 인덱스 오류를 상태 코드로 돌려준다
+        first = await run_in_threadpool(next, chunks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log_exception("❌ Index export error: ", e)
+        raise HTTPException(status_code=500, detail=f"Index export error: {e}")
+
+    def body():
+        yield first
+        yield from chunks
+
+    safe_print(f"📤 인덱스 스냅샷 다운로드 시작: {index_name}")
+    return StreamingResponse(
+        body(),
+        media_type="application/gzip",
+        # identity: 이미 gzip인 스냅샷을 GZip 미들웨어가 다시 압축하거나 모아 두지 않도록
+        headers={
+            "Content-Encoding": "identity",
+            "Content-Disposition": f'attachment; filename="{index_name}.jsonl.gz"',
+        },
+    )
+
+
+@router.post("/indexes/{index_name}/import")
+async def import_index_endpoint(
+    index_name: str,
+    file: UploadFile = File(...),
+    batch_size: Optional[int] = Query(default=None, ge=1, le=1000),
+    concurrency: Optional[int] = Query(default=None, ge=1, le=32),
+):
+    """스냅샷 파일을 index_name 인덱스에 업로드 (임베딩 재생성 없음)"""
+    try:
+        return await run_in_threadpool(
+            import_snapshot,
+            file.file,
+            index_name,
+            batch_size or INDEX_TRANSFER_BATCH_SIZE,
+            concurrency or INDEX_TRANSFER_CONCURRENCY,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log_exception("❌ Index import error: ", e)
+        raise HTTPException(status_code=500, detail=f"Index import error: {e}")
+
+
+@router.post("/indexes/copy")
+async def copy_index_endpoint(request: CopyIndexRequest):
+    """source 인덱스를 target 인덱스로 복사 (벡터 그대로, target은 현재 프로필로 생성)"""
+    try:
+        stats = await run_in_threadpool(
+            copy_index,
+            request.source,
+            request.target,
+            request.batch_size or INDEX_TRANSFER_BATCH_SIZE,
+            request.concurrency or INDEX_TRANSFER_CONCURRENCY,
+            request.continuation_token,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TransferInterrupted as e:
+        # 받은 토큰으로 다시 호출하면 중단된 페이지부터 이어서 복사
+        raise HTTPException(
+            status_code=502,
+            detail={"message": f"인덱스 복사 중단: {e}", "continuation_token": e.continuation_token, **e.stats},
+        )
+    if request.select and stats["failed"] == 0:
+        set_current_index(request.target)
+    return stats
@@ -1,12 +1,21 @@
+import asyncio
 import json
 import uuid
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.services.search_service import search_documents
-from app.services.openai_service import chat_with_context, analyze_files_for_handover
+from app.config import REQUEST_DEADLINE_ANALYZE, REQUEST_DEADLINE_CHAT, SEARCH_DEFAULT_MODE
+from app.services.conversation_service import prepare_conversation
+from app.services.query_planner import plan_query
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.search_service import get_current_index, search_documents
+from app.services.openai_service import chat_with_context, analyze_files_for_handover, stream_handover
+from app.utils.deadline import Deadline, DeadlineExceeded, deadline_http_error, watch_disconnect
+from app.utils.handover_schema import empty_handover
 from app.utils.logging_utils import log_exception, safe_print
 
 router = APIRouter()
@@ -15,17 +24,46 @@ class ChatMessage(BaseModel):
     role: str
     content: str
 
+class SearchFilters(BaseModel):
+    """검색 사전 필터 - 지정한 조건을 모두 만족하는 청크에서만 검색"""
+    owner: Optional[str] = None
+    file_types: Optional[List[str]] = None
+    file_names: Optional[List[str]] = None
+    uploaded_after: Optional[datetime] = None
+    uploaded_before: Optional[datetime] = None
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+
 class ChatRequest(BaseModel):
     messages: list
     index_names: Optional[List[str]] = None
+    conversation_id: Optional[str] = None
+    filters: Optional[SearchFilters] = None
+    # 검색 방식 - 생략 시 SEARCH_DEFAULT_MODE
+    mode: Optional[Literal["keyword", "vector", "hybrid", "auto"]] = None
 
 class AnalyzeRequest(BaseModel):
     messages: list
     index_names: Optional[List[str]] = None
 
+def _rate_limited(error: RateLimitExceeded, request_id: str) -> HTTPException:
+    safe_print(f"⏳ 호출 한도 초과로 요청 거절: {error}")
+    return HTTPException(
+        status_code=429,
+        detail=f"{error} (request_id={request_id})",
+        headers={"Retry-After": str(int(error.retry_after + 0.999))},
+    )
+
 @router.post("/analyze")
-async def analyze(request: AnalyzeRequest):
+async def analyze(
+    request: AnalyzeRequest,
+    http_request: Request,
+    x_session_id: Optional[str] = Header(default=None),
+):
     request_id = str(uuid.uuid4())
+    # 클라이언트가 떠나거나 마감 시간이 지나면 진행 중인 검색/LLM 호출을 멈춘다
+    deadline = Deadline(REQUEST_DEADLINE_ANALYZE)
+    watcher = watch_disconnect(http_request, deadline)
     try:
         # 프론트엔드에서 보낸 메시지 형식 처리
         messages = request.messages
@@ -40,7 +78,8 @@ async def analyze(request: AnalyzeRequest):
 
         # OpenAI API를 호출하여 인수인계서 JSON 생성
         safe_print("🤖 OpenAI API 호출 시작...")
-        response = analyze_files_for_handover(user_message, request.index_names)
+        index_names = request.index_names or [get_current_index(x_session_id)]
+        response = await deadline.run(analyze_files_for_handover, user_message, index_names)
         safe_print(f"✅ OpenAI 응답 완료 - 타입: {type(response)}")
         safe_print(f"   응답 샘플: {str(response)[:200]}")
 
@@ -65,17 +104,100 @@ async def analyze(request: AnalyzeRequest):
             "content": response,
             "request_id": request_id,
         }
+    except RateLimitExceeded as e:
+        raise _rate_limited(e, request_id)
+    except DeadlineExceeded as e:
+        raise deadline_http_error(e, request_id)
     except Exception as e:
         log_exception("❌ Analyze error: ", e)
         raise HTTPException(status_code=500, detail=f"{e} (request_id={request_id})")
+    finally:
+        watcher.cancel()
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _stream_error(error: Exception, request_id: str) -> dict:
+    """스트림 도중 실패 - 응답 상태(200)는 이미 나갔으므로 일반 API와 같은 상태/메시지를 이벤트로 전달"""
+    if isinstance(error, RateLimitExceeded):
+        http_error = _rate_limited(error, request_id)
+    elif isinstance(error, DeadlineExceeded):
+        http_error = deadline_http_error(error, request_id)
+    else:
+        log_exception("❌ Analyze stream error: ", error)
+        http_error = HTTPException(status_code=500, detail=f"{error} (request_id={request_id})")
+    return {"status": http_error.status_code, "detail": http_error.detail, "request_id": request_id}
+
+@router.post("/analyze/stream")
+async def analyze_stream(
+    request: AnalyzeRequest,
+    http_request: Request,
+    x_session_id: Optional[str] = Header(default=None),
+):
+    """/analyze의 스트리밍 버전 (Server-Sent Events).
+
+    이벤트 순서: start(빈 인수인계서 구조) → section(섹션이 완성될 때마다 {name, value})
+    → done(최종 스키마 검증을 거친 전체 content). 실패하면 error({status, detail})로 끝난다.
+    """
+    request_id = str(uuid.uuid4())
+    deadline = Deadline(REQUEST_DEADLINE_ANALYZE)
+    user_message = next((m["content"] for m in request.messages if m["role"] == "user"), "")
+    index_names = request.index_names or [get_current_index(x_session_id)]
+    safe_print(f"🔍 /analyze/stream 요청 수신 - 사용자 메시지 길이: {len(user_message)}")
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def produce():
+        # 작업 스레드에서 생성한 이벤트를 이벤트 루프의 큐로 넘긴다
+        for event in stream_handover(user_message, index_names):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def events():
+        watcher = watch_disconnect(http_request, deadline)
+        task = asyncio.create_task(deadline.run(produce))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            yield _sse("start", {"content": empty_handover(), "request_id": request_id})
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                name, data = event
+                if name == "done":
+                    data = {"content": data, "request_id": request_id}
+                    safe_print(f"📤 /analyze/stream 완료 - 필드: {list(data['content'].keys())}")
+                yield _sse(name, data)
+            await task
+        except Exception as e:
+            yield _sse("error", _stream_error(e, request_id))
+        finally:
+            # 클라이언트가 떠나 스트림이 닫혀도 작업 스레드의 LLM 스트리밍이 멈추도록 취소
+            deadline.cancel()
+            watcher.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # identity: GZip 미들웨어가 이벤트를 모아 압축하느라 전송을 늦추지 않도록
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
 
 @router.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(
+    request: ChatRequest,
+    http_request: Request,
+    x_session_id: Optional[str] = Header(default=None),
+):
     request_id = str(uuid.uuid4())
+    deadline = Deadline(REQUEST_DEADLINE_CHAT)
+    watcher = watch_disconnect(http_request, deadline)
     try:
-        # messages 배열에서 사용자 메시지 추출
-        messages = request.messages
-        user_message = next((m["content"] for m in messages if m["role"] == "user"), "")
+        # messages 배열에서 마지막 사용자 메시지와 이전 대화 맥락 추출
+        conversation = await deadline.run(
+            prepare_conversation, request.messages, request.conversation_id
+        )
+        user_message = conversation.query
 
         if not user_message:
             return {
@@ -86,13 +208,23 @@ async def chat(request: ChatRequest):
 
         safe_print(f"💬 /chat 요청 수신 - 메시지: {user_message[:100]}")
 
-        # 1. 관련 문서 검색
-        search_results = search_documents(user_message, index_names=request.index_names)
+        # 1. 관련 문서 검색 (이전 대화를 반영한 독립 질문으로 검색)
+        index_names = request.index_names or [get_current_index(x_session_id)]
+        filters = request.filters.dict(exclude_none=True) if request.filters else None
+        # 계획은 여기서 한 번만 만들고 검색에 그대로 넘겨, 응답의 retrieval이 실제 실행한 계획이 되도록
+        retrieval = plan_query(conversation.standalone_query, request.mode or SEARCH_DEFAULT_MODE)
+        safe_print(f"🧭 검색 계획: {retrieval['mode']} ({retrieval['reason']})")
+        search_results = await deadline.run(
+            search_documents, conversation.standalone_query,
+            index_names=index_names, filters=filters, plan=retrieval,
+        )
 
         if not search_results:
             return {
                 "content": "관련 문서를 찾을 수 없습니다. 먼저 문서를 업로드해주세요.",
                 "response": "관련 문서를 찾을 수 없습니다. 먼저 문서를 업로드해주세요.",
+                "conversation_id": conversation.conversation_id,
+                "retrieval": retrieval,
                 "request_id": request_id,
             }
 
@@ -103,15 +235,29 @@ async def chat(request: ChatRequest):
         ])
 
         # 3. GPT로 답변 생성
-        response = chat_with_context(user_message, context)
+        response = await deadline.run(
+            chat_with_context,
+            user_message,
+            context,
+            conversation.summary,
+            conversation.recent,
+        )
         safe_print(f"✅ 채팅 응답 완료 - {len(response)} 글자")
 
         return {
             "content": response,
             "response": response,
             "sources": [doc["file_name"] for doc in search_results],
+            "conversation_id": conversation.conversation_id,
+            "retrieval": retrieval,
             "request_id": request_id,
         }
+    except RateLimitExceeded as e:
+        raise _rate_limited(e, request_id)
+    except DeadlineExceeded as e:
+        raise deadline_http_error(e, request_id)
     except Exception as e:
         log_exception("❌ Chat error: ", e)
         raise HTTPException(status_code=500, detail=f"{e} (request_id={request_id})")
+    finally:
+        watcher.cancel()
@@ -1,22 +1,27 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Header, HTTPException
+
+from app.services.cpu_pool import get_cpu_pool_stats
+from app.services.rate_limiter import get_rate_limit_stats
 from app.services.search_service import (
     get_current_index,
     get_document_count,
     list_all_indexes,
 )
 from app.utils.logging_utils import log_exception, safe_print
+from app.utils.single_flight import get_single_flight_stats
 
 router = APIRouter()
 
 
 @router.get("/")
-async def report_status():
+async def report_status(x_session_id: Optional[str] = Header(default=None)):
     """시스템 리포트: 인덱스/문서 상태 요약."""
     try:
-        indexes = list_all_indexes()
-        current_index = get_current_index()
-        document_count = get_document_count()
+        indexes = list_all_indexes(x_session_id)
+        current_index = get_current_index(x_session_id)
+        document_count = get_document_count(current_index)
         safe_print(
             "📊 리포트 생성 완료 - "
             f"indexes={len(indexes)}, current={current_index}, docs={document_count}"
@@ -29,3 +34,13 @@ async def report_status():
     except Exception as e:
         log_exception("❌ Report error: ", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/metrics")
+async def runtime_metrics():
+    """호출 제한기 대기열, single-flight 병합, CPU 프로세스 풀 대기열/작업 시간 현황."""
+    return {
+        "rate_limits": get_rate_limit_stats(),
+        "single_flight": get_single_flight_stats(),
+        "cpu_pool": get_cpu_pool_stats(),
+    }
@@ -1,20 +1,21 @@
-import uuid
 import traceback
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Query, UploadFile, File, HTTPException
+from fastapi import APIRouter, Header, Query, Request, UploadFile, File, HTTPException
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from app.services.blob_service import upload_to_blob
-from app.services.document_service import extract_text_from_url
+from app.config import BULK_UPLOAD_CONCURRENCY, REQUEST_DEADLINE_UPLOAD
+from app.services.ingestion_service import ingest_document, ingest_many
 from app.services.search_service import (
-    add_document_to_index,
     get_document_count,
+    get_metadata_facets,
     list_all_indexes,
     set_current_index,
     get_current_index,
     list_documents,
 )
+from app.utils.deadline import Deadline, DeadlineExceeded, deadline_http_error, watch_disconnect
 from app.utils.logging_utils import safe_print
 
 router = APIRouter()
@@ -27,11 +28,11 @@ class SelectIndexRequest(BaseModel):
 # ============================================================
 
 @router.get("/indexes")
-async def get_indexes():
+async def get_indexes(x_session_id: Optional[str] = Header(default=None)):
     """사용 가능한 모든 RAG 인덱스 목록 조회"""
     try:
-        indexes = list_all_indexes()
-        current = get_current_index()
+        indexes = list_all_indexes(x_session_id)
+        current = get_current_index(x_session_id)
         safe_print(f"📚 인덱스 목록 반환: {len(indexes)}개, 현재 선택: {current}")
         return {
             "indexes": indexes,
@@ -43,11 +44,14 @@ async def get_indexes():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/indexes/select")
-async def select_index(request: SelectIndexRequest):
-    """사용할 RAG 인덱스 선택"""
+async def select_index(
+    request: SelectIndexRequest,
+    x_session_id: Optional[str] = Header(default=None),
+):
+    """사용할 RAG 인덱스 선택 (X-Session-Id 헤더가 있으면 해당 세션에만 적용)"""
     try:
         index_name = request.index_name
-        set_current_index(index_name)
+        set_current_index(index_name, x_session_id)
         safe_print(f"✅ 인덱스 선택됨: {index_name}")
         return {
             "message": f"인덱스 '{index_name}'가 선택되었습니다.",
@@ -59,82 +63,93 @@ async def select_index(request: SelectIndexRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/indexes/current")
-async def get_current():
+async def get_current(x_session_id: Optional[str] = Header(default=None)):
     """현재 선택된 인덱스 조회"""
-    current = get_current_index()
+    current = get_current_index(x_session_id)
     return {"current_index": current}
 
 # ============================================================
 # 파일 업로드 API
 # ============================================================
 
+def _resolve_target_indexes(
+    index_name: Optional[str],
+    index_names: Optional[str],
+    session_id: Optional[str],
+) -> List[str]:
+    if index_names:
+        return [name.strip() for name in index_names.split(",") if name.strip()]
+    return [index_name] if index_name else [get_current_index(session_id)]
+
 @router.post("/upload")
 async def upload_document(
+    http_request: Request,
     file: UploadFile = File(...),
     index_name: Optional[str] = Query(default=None),
     index_names: Optional[str] = Query(default=None),
+    owner: Optional[str] = Query(default=None),
+    x_session_id: Optional[str] = Header(default=None),
 ):
+    deadline = Deadline(REQUEST_DEADLINE_UPLOAD)
+    watcher = watch_disconnect(http_request, deadline)
     try:
         # 1. 파일 데이터 읽기
         file_data = await file.read()
 
-        # 2. 파일 확장자 확인
-        file_ext = file.filename.lower().split('.')[-1] if '.' in file.filename else ''
-
-        # 3. Blob 업로드 (txt 포함) + 텍스트 추출
-        blob_url = None
-        try:
-            safe_print(f"📤 Blob 업로드 시도: {file.filename}")
-            blob_url = upload_to_blob(file.filename, file_data)
-            safe_print(f"✅ Blob 업로드 완료: {blob_url}")
-        except Exception as blob_error:
-            safe_print(f"⚠️  Blob 업로드 실패: {blob_error}")
-
-        if file_ext == 'txt':
-            # txt 파일은 직접 디코딩
-            try:
-                extracted_text = file_data.decode('utf-8')
-            except UnicodeDecodeError:
-                extracted_text = file_data.decode('cp949', errors='ignore')
-        else:
-            # PDF, 이미지 등은 Blob 업로드 후 Document Intelligence 사용
-            try:
-                if not blob_url:
-                    raise Exception("Blob URL이 없습니다.")
-                safe_print("🔍 Document Intelligence로 텍스트 추출 시작...")
-                extracted_text = extract_text_from_url(blob_url)
-                safe_print(f"✅ 텍스트 추출 완료 ({len(extracted_text)} 글자)")
-            except Exception as doc_error:
-                safe_print(f"⚠️  Document Intelligence 실패: {doc_error}")
-                # Document Intelligence 실패 시 파일명과 기본 메시지로 폴백
-                extracted_text = f"[파일명: {file.filename}]\n[주의: 자동 텍스트 추출 실패. Document Intelligence 설정 필요]\n\n파일을 텍스트로 변환하여 업로드해주세요."
-
-        # 4. AI Search에 인덱싱 (실패해도 텍스트는 반환)
-        doc_id = str(uuid.uuid4())
-        target_indexes = (
-            [name.strip() for name in index_names.split(",") if name.strip()]
-            if index_names
-            else [index_name] if index_name else [get_current_index()]
-        )
-        try:
-            for target_index in target_indexes:
-                add_document_to_index(doc_id, extracted_text, file.filename, target_index)
-            safe_print(f"✅ AI Search 인덱싱 완료 ({len(target_indexes)}개)")
-        except Exception as index_error:
-            safe_print(f"⚠️  AI Search 인덱싱 실패 (계속 진행): {index_error}")
+        # 2. Blob 업로드 → 텍스트 추출 → AI Search 인덱싱 (인덱싱 실패해도 텍스트는 반환)
+        target_indexes = _resolve_target_indexes(index_name, index_names, x_session_id)
+        result = await deadline.run(ingest_document, file.filename, file_data, target_indexes, owner)
 
         return {
             "message": "문서 업로드 완료",
             "file_name": file.filename,
-            "doc_id": doc_id,
-            "extracted_text": extracted_text,
-            "blob_url": blob_url,
+            "doc_id": result["doc_id"],
+            "extracted_text": result["extracted_text"],
+            "blob_url": result["blob_url"],
             "index_names": target_indexes,
+            "index_stats": result["index_stats"],
+            "metadata": result["metadata"],
         }
+    except DeadlineExceeded as e:
+        raise deadline_http_error(e)
     except Exception as e:
         safe_print(f"❌ Upload error: {e}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Upload error: {str(e)}")
+    finally:
+        watcher.cancel()
+
+@router.post("/bulk")
+async def upload_documents_bulk(
+    files: List[UploadFile] = File(...),
+    index_name: Optional[str] = Query(default=None),
+    index_names: Optional[str] = Query(default=None),
+    concurrency: Optional[int] = Query(default=None, ge=1, le=32),
+    owner: Optional[str] = Query(default=None),
+    x_session_id: Optional[str] = Header(default=None),
+):
+    """여러 파일 또는 ZIP 아카이브를 한 번에 업로드 - 파일별 처리 결과 반환"""
+    try:
+        target_indexes = _resolve_target_indexes(index_name, index_names, x_session_id)
+        uploads = [(file.filename, file.file) for file in files]
+        safe_print(f"📦 대량 업로드 요청 - 업로드 {len(uploads)}개, 대상 인덱스 {target_indexes}")
+        results = await run_in_threadpool(
+            ingest_many, uploads, target_indexes, concurrency or BULK_UPLOAD_CONCURRENCY, owner
+        )
+        summary = {}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        return {
+            "message": "대량 업로드 완료",
+            "total": len(results),
+            "summary": summary,
+            "index_names": target_indexes,
+            "results": results,
+        }
+    except Exception as e:
+        safe_print(f"❌ Bulk upload error: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Bulk upload error: {str(e)}")
 
 @router.get("/stats")
 async def get_stats():
@@ -157,18 +172,24 @@ async def get_stats():
         }
 
 @router.get("/documents")
-async def list_documents_endpoint(index_names: Optional[str] = Query(default=None)):
-    """AI Search 인덱스에 저장된 모든 문서 목록 조회 - 실제 content 포함"""
+async def list_documents_endpoint(
+    index_names: Optional[str] = Query(default=None),
+    top: int = Query(default=100, ge=1, le=1000),
+    skip: int = Query(default=0, ge=0, le=100000),
+    x_session_id: Optional[str] = Header(default=None),
+):
+    """AI Search 인덱스에 저장된 문서 목록 조회 - 실제 content 포함 (top/skip으로 페이지 조회)"""
     try:
         target_indexes = (
             [name.strip() for name in index_names.split(",") if name.strip()]
             if index_names
-            else None
+            else [get_current_index(x_session_id)]
         )
-        docs = list_documents(index_names=target_indexes, top=100)
+        docs = list_documents(index_names=target_indexes, top=top, skip=skip)
         safe_print(f"📋 API 응답: {len(docs)}개 문서 (실제 content 포함)")
         return {
             "count": len(docs),
+            "skip": skip,
             "documents": docs
         }
     except Exception as e:
@@ -178,3 +199,13 @@ async def list_documents_endpoint(index_names: Optional[str] = Query(default=Non
             "count": 0,
             "documents": []
         }
+
+@router.get("/facets")
+async def get_facets(
+    index_names: Optional[str] = Query(default=None),
+    x_session_id: Optional[str] = Header(default=None),
+):
+    """검색 필터 선택지 - 소유자/파일 형식별 문서 수"""
+    target_indexes = _resolve_target_indexes(None, index_names, x_session_id)
+    facets = await run_in_threadpool(get_metadata_facets, target_indexes)
+    return {"index_names": target_indexes, "facets": facets}
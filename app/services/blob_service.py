@@ -1,25 +1,43 @@
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
 from datetime import datetime, timedelta
+from functools import lru_cache
 from app.config import AZURE_STORAGE_ACCOUNT_NAME, AZURE_STORAGE_ACCOUNT_KEY
+from app.utils.deadline import azure_timeouts, stage
 
 CONTAINER_NAME = "documents"
 
+# 컨테이너 생성 여부 (업로드마다 create_container 호출 방지)
+_container_ready = False
+
+@lru_cache(maxsize=1)
 def get_blob_service_client():
+    # SDK는 첫 사용 시점에 import - 서버 기동 시간 단축, 클라이언트는 연결 풀 재사용을 위해 캐시
+    from azure.storage.blob import BlobServiceClient
+
     connection_string = f"DefaultEndpointsProtocol=https;AccountName={AZURE_STORAGE_ACCOUNT_NAME};AccountKey={AZURE_STORAGE_ACCOUNT_KEY};EndpointSuffix=core.windows.net"
     return BlobServiceClient.from_connection_string(connection_string)
 
-def upload_to_blob(file_name: str, file_data: bytes) -> str:
-    blob_service_client = get_blob_service_client()
-    container_client = blob_service_client.get_container_client(CONTAINER_NAME)
-    
-    # 컨테이너 없으면 생성
+def ensure_container():
+    """컨테이너 없으면 생성 (프로세스당 한 번만 확인)"""
+    global _container_ready
+    if _container_ready:
+        return
+    container_client = get_blob_service_client().get_container_client(CONTAINER_NAME)
     try:
         container_client.create_container()
     except: 
         pass
+    _container_ready = True
+
+def upload_to_blob(file_name: str, file_data: bytes) -> str:
+    from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+
+    blob_service_client = get_blob_service_client()
+    container_client = blob_service_client.get_container_client(CONTAINER_NAME)
+    ensure_container()
     
     blob_client = container_client.get_blob_client(file_name)
-    blob_client.upload_blob(file_data, overwrite=True)
+    with stage("blob") as timeout:
+        blob_client.upload_blob(file_data, overwrite=True, **azure_timeouts(timeout))
     
     # SAS 토큰 생성 (1시간 유효)
     sas_token = generate_blob_sas(
@@ -0,0 +1,122 @@
+"""멀티턴 채팅 맥락 관리.
+
+최근 메시지 CHAT_RECENT_MESSAGES개만 원문으로 프롬프트에 넣고, 그보다 오래된 대화는
+롤링 요약으로 압축해 대화 ID별로 공유 저장소에 캐시한다. 매 턴마다 새로 밀려난
+메시지만 기존 요약에 합치므로 대화가 길어져도 턴당 프롬프트 비용이 일정하다.
+"""
+import hashlib
+import json
+from typing import List, Optional
+
+from app.config import (
+    CHAT_MESSAGE_MAX_CHARS,
+    CHAT_RECENT_MESSAGES,
+    CHAT_SUMMARY_MAX_TOKENS,
+    CONVERSATION_TTL,
+)
+from app.services.openai_service import rewrite_standalone_query, summarize_conversation
+from app.services.state_store import get_state_store
+from app.utils.logging_utils import log_exception, safe_print
+
+# 캐시가 없을 때 한 번에 요약할 최대 메시지 수 (긴 기록도 호출당 비용을 제한)
+_SUMMARY_BATCH = 8
+
+
+class ConversationContext:
+    def __init__(
+        self,
+        conversation_id: str,
+        query: str,
+        standalone_query: str,
+        summary: str,
+        recent: List[dict],
+    ):
+        self.conversation_id = conversation_id
+        self.query = query
+        self.standalone_query = standalone_query
+        self.summary = summary
+        self.recent = recent
+
+
+def _clip(message: dict) -> dict:
+    content = str(message.get("content") or "")
+    if len(content) > CHAT_MESSAGE_MAX_CHARS:
+        content = content[:CHAT_MESSAGE_MAX_CHARS] + " …"
+    return {"role": message["role"], "content": content}
+
+
+def _prefix_hash(messages: List[dict]) -> str:
+    raw = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _default_conversation_id(turns: List[dict]) -> str:
+    # 대화 ID가 없으면 첫 사용자 메시지로 대화를 식별
+    first = next((m["content"] for m in turns if m["role"] == "user"), "")
+    return "auto-" + hashlib.sha256(first.encode("utf-8")).hexdigest()[:24]
+
+
+def _summarize_older(conversation_id: str, older: List[dict]) -> str:
+    """older 전체를 요약. 캐시된 요약이 older의 앞부분과 일치하면 나머지만 더 요약한다."""
+    store = get_state_store()
+    key = f"conversation:{conversation_id}"
+    cached = None
+    try:
+        cached = store.get(key)
+    except Exception as e:
+        log_exception("⚠️  대화 요약 캐시 조회 실패: ", e)
+
+    summary = ""
+    start = 0
+    if cached:
+        count = cached.get("count", 0)
+        if count <= len(older) and cached.get("hash") == _prefix_hash(older[:count]):
+            summary = cached.get("summary", "")
+            start = count
+        else:
+            safe_print(f"ℹ️  대화 기록이 캐시와 달라 요약을 다시 생성: {conversation_id}")
+
+    if start == len(older):
+        return summary
+
+    for batch_start in range(start, len(older), _SUMMARY_BATCH):
+        batch = older[batch_start:batch_start + _SUMMARY_BATCH]
+        summary = summarize_conversation(summary, batch, CHAT_SUMMARY_MAX_TOKENS)
+
+    try:
+        store.set(
+            key,
+            {"summary": summary, "count": len(older), "hash": _prefix_hash(older)},
+            CONVERSATION_TTL,
+        )
+    except Exception as e:
+        log_exception("⚠️  대화 요약 캐시 저장 실패: ", e)
+    return summary
+
+
+def prepare_conversation(messages: list, conversation_id: Optional[str] = None) -> ConversationContext:
+    """요청 메시지 목록을 마지막 질문 + 요약 + 최근 대화로 정리."""
+    turns = [
+        _clip(m) for m in messages
+        if isinstance(m, dict) and m.get("role") in ("user", "assistant") and m.get("content")
+    ]
+    last_user = max((i for i, m in enumerate(turns) if m["role"] == "user"), default=None)
+    if last_user is None:
+        return ConversationContext(conversation_id or "", "", "", "", [])
+
+    query = turns[last_user]["content"]
+    history = turns[:last_user]
+    conversation_id = conversation_id or _default_conversation_id(turns)
+
+    if not history:
+        return ConversationContext(conversation_id, query, query, "", [])
+
+    recent = history[-CHAT_RECENT_MESSAGES:] if CHAT_RECENT_MESSAGES > 0 else []
+    older = history[:len(history) - len(recent)]
+    summary = _summarize_older(conversation_id, older) if older else ""
+    standalone_query = rewrite_standalone_query(query, summary, recent)
+    safe_print(
+        f"🧵 대화 맥락 - 요약된 메시지 {len(older)}개, 최근 {len(recent)}개, "
+        f"검색 질문: {standalone_query[:100]}"
+    )
+    return ConversationContext(conversation_id, query, standalone_query, summary, recent)
@@ -0,0 +1,223 @@
+"""CPU를 많이 쓰는 수집 단계(텍스트 디코딩, 청킹/해시)를 위한 프로세스 풀.
+
+요청 처리 스레드에서 큰 파일을 디코딩/청킹하면 GIL을 잡고 있어 같은 워커의 다른 요청이
+모두 느려진다. 이런 작업을 spawn 방식의 별도 프로세스에서 실행한다.
+
+- 작은 입력(CPU_POOL_INLINE_BYTES 미만)은 프로세스 간 전달 비용이 더 크므로 바로 실행
+- 큰 바이트 입력(CPU_POOL_SHM_BYTES 이상)은 SharedMemory에 한 번 복사해 이름만 넘기고,
+  작업 프로세스는 복사 없이 memoryview로 읽는다
+- 대기 + 실행 중인 작업 수는 CPU_POOL_MAX_PENDING개로 제한 (초과 시 제출자가 기다림)
+- 작업별 대기/실행 시간과 대기열 길이는 get_cpu_pool_stats()로 /api/report/metrics에 노출
+- CPU_POOL_WORKERS=0이면 풀 없이 모두 바로 실행
+"""
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import (
+    CPU_POOL_INLINE_BYTES,
+    CPU_POOL_MAX_PENDING,
+    CPU_POOL_SHM_BYTES,
+    CPU_POOL_WORKERS,
+)
+from app.utils import cpu_tasks
+from app.utils.deadline import POLL_INTERVAL, check_deadline
+from app.utils.logging_utils import safe_print
+
+# 작업별로 보관하는 최근 실행 시간 개수 (p95 계산용)
+_SAMPLES = 200
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, CPU_POOL_MAX_PENDING))
+_stats_lock = threading.Lock()
+_pending = 0
+_max_pending = 0
+_counters = {"submitted": 0, "inline": 0, "shared_memory": 0, "failed": 0, "restarts": 0}
+_task_times: Dict[str, dict] = {}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # fork는 스레드/SDK 연결 상태까지 복제하므로 spawn 사용
+            _executor = ProcessPoolExecutor(
+                max_workers=CPU_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            safe_print(f"🧵 CPU 프로세스 풀 시작 - 작업 프로세스 {CPU_POOL_WORKERS}개")
+        return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+            with _stats_lock:
+                _counters["restarts"] += 1
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _record(name: str, queued: float, elapsed: float, mode: str) -> None:
+    with _stats_lock:
+        entry = _task_times.setdefault(name, {
+            "count": 0, "inline": 0, "total_seconds": 0.0, "queue_seconds": 0.0,
+            "max_seconds": 0.0, "recent": deque(maxlen=_SAMPLES),
+        })
+        entry["count"] += 1
+        if mode == "inline":
+            entry["inline"] += 1
+        entry["total_seconds"] += elapsed
+        entry["queue_seconds"] += queued
+        entry["max_seconds"] = max(entry["max_seconds"], elapsed)
+        entry["recent"].append(elapsed)
+
+
+def _acquire_slot() -> None:
+    """대기열에 자리가 날 때까지 대기 (요청 마감/취소 확인)."""
+    global _pending, _max_pending
+    while not _slots.acquire(timeout=POLL_INTERVAL):
+        check_deadline("cpu")
+    with _stats_lock:
+        _pending += 1
+        _max_pending = max(_max_pending, _pending)
+
+
+def _release_slot() -> None:
+    global _pending
+    with _stats_lock:
+        _pending -= 1
+    _slots.release()
+
+
+def _wait_result(future) -> Tuple[Any, float]:
+    while True:
+        try:
+            return future.result(timeout=POLL_INTERVAL)
+        except FutureTimeoutError:
+            try:
+                check_deadline("cpu")
+            except Exception:
+                # 아직 시작하지 않은 작업은 취소 (이미 실행 중이면 끝까지 돌고 결과는 버림)
+                future.cancel()
+                raise
+
+
+def run_task(name: str, fn: Callable, args: tuple, size: int) -> Any:
+    """fn(*args)를 프로세스 풀에서 실행. size(입력 바이트 수)가 작거나 풀이 꺼져 있으면 바로 실행."""
+    if CPU_POOL_WORKERS <= 0 or size < CPU_POOL_INLINE_BYTES:
+        started = time.perf_counter()
+        result = fn(*args)
+        with _stats_lock:
+            _counters["inline"] += 1
+        _record(name, 0.0, time.perf_counter() - started, "inline")
+        return result
+
+    check_deadline("cpu")
+    _acquire_slot()
+    submitted = time.perf_counter()
+    try:
+        with _stats_lock:
+            _counters["submitted"] += 1
+        executor = _get_executor()
+        try:
+            result, elapsed = _wait_result(executor.submit(cpu_tasks.timed, fn, args))
+        except BrokenProcessPool:
+            # 작업 프로세스가 죽었으면 풀을 새로 만들고 이번 작업은 현재 스레드에서 처리
+            safe_print(f"⚠️  CPU 프로세스 풀 재시작 ({name})")
+            _reset_executor(executor)
+            started = time.perf_counter()
+            result = fn(*args)
+            elapsed = time.perf_counter() - started
+        _record(name, time.perf_counter() - submitted - elapsed, elapsed, "pool")
+        return result
+    except BaseException:
+        with _stats_lock:
+            _counters["failed"] += 1
+        raise
+    finally:
+        _release_slot()
+
+
+def decode_text(data: bytes) -> str:
+    """txt 업로드 디코딩 (UTF-8 → cp949). 큰 파일은 공유 메모리로 작업 프로세스에 넘긴다."""
+    size = len(data)
+    if CPU_POOL_WORKERS <= 0 or size < CPU_POOL_SHM_BYTES:
+        return run_task("decode_text", cpu_tasks.decode_text, (data,), size)
+
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm.buf[:size] = data
+        with _stats_lock:
+            _counters["shared_memory"] += 1
+        return run_task(
+            "decode_text", cpu_tasks.decode_text, (cpu_tasks.SharedBuffer(shm.name, size),), size
+        )
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def chunk_document(text: str, max_chars: int, min_chars: int) -> List[Tuple[str, str]]:
+    """텍스트 청킹 + 청크 해시 [(chunk, hash)]."""
+    # 한글은 UTF-8 3바이트 - 글자 수로 대략적인 입력 크기 추정
+    return run_task(
+        "chunk_document", cpu_tasks.chunk_document, (text, max_chars, min_chars), len(text) * 2
+    )
+
+
+def warm_cpu_pool() -> None:
+    """작업 프로세스를 미리 띄워 첫 대용량 업로드의 spawn 지연을 없앤다."""
+    if CPU_POOL_WORKERS <= 0:
+        return
+    executor = _get_executor()
+    for future in [executor.submit(cpu_tasks.warm) for _ in range(CPU_POOL_WORKERS)]:
+        future.result()
+
+
+def shutdown_cpu_pool() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+        safe_print("🧵 CPU 프로세스 풀 종료")
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def get_cpu_pool_stats() -> dict:
+    with _stats_lock:
+        tasks = {
+            name: {
+                "count": entry["count"],
+                "inline": entry["inline"],
+                "avg_ms": round(entry["total_seconds"] / entry["count"] * 1000, 2),
+                "p95_ms": round(_percentile(list(entry["recent"]), 95) * 1000, 2),
+                "max_ms": round(entry["max_seconds"] * 1000, 2),
+                "avg_queue_ms": round(entry["queue_seconds"] / entry["count"] * 1000, 2),
+            }
+            for name, entry in _task_times.items()
+        }
+        return {
+            "workers": CPU_POOL_WORKERS,
+            "started": _executor is not None,
+            "queue_depth": _pending,
+            "max_queue_depth": _max_pending,
+            "queue_limit": CPU_POOL_MAX_PENDING,
+            **_counters,
+            "tasks": tasks,
+        }
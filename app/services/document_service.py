@@ -1,21 +1,44 @@
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
+import time
+from functools import lru_cache
+from typing import List
 from app.config import AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT, AZURE_DOCUMENT_INTELLIGENCE_KEY
+from app.utils.deadline import DeadlineExceeded, azure_timeouts, check_deadline, stage
 
+@lru_cache(maxsize=1)
 def get_document_client():
+    # SDK는 첫 사용 시점에 import, 클라이언트는 연결 풀 재사용을 위해 캐시
+    from azure.ai.formrecognizer import DocumentAnalysisClient
+    from azure.core.credentials import AzureKeyCredential
+
     return DocumentAnalysisClient(
         endpoint=AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT,
         credential=AzureKeyCredential(AZURE_DOCUMENT_INTELLIGENCE_KEY)
     )
 
-def extract_text_from_url(blob_url: str) -> str:
+def extract_pages_from_url(blob_url: str) -> List[str]:
+    """페이지별 텍스트 목록 (페이지 범위 메타데이터용)"""
     client = get_document_client()
-    poller = client.begin_analyze_document_from_url("prebuilt-read", blob_url)
-    result = poller.result()
-    
-    text = ""
+    with stage("extraction") as timeout:
+        give_up_at = time.monotonic() + timeout
+        poller = client.begin_analyze_document_from_url("prebuilt-read", blob_url, **azure_timeouts(timeout))
+        # 분석이 끝날 때까지 짧게 나눠 기다리며 요청 취소/시간 초과를 확인
+        while not poller.done():
+            check_deadline("extraction")
+            if time.monotonic() > give_up_at:
+                raise DeadlineExceeded("extraction")
+            poller.wait(1)
+        result = poller.result()
+
+    pages = []
     for page in result.pages:
-        for line in page.lines:
-            text += line.content + "\n"
-    
-    return text
\ No newline at end of file
+        pages.append("".join(line.content + "\n" for line in page.lines))
+    return pages
+
+def extract_text_from_url(blob_url: str) -> str:
+    return "".join(extract_pages_from_url(blob_url))
+
+def decode_text_file(file_data: bytes) -> str:
+    """txt 파일 디코딩 - UTF-8 실패 시 cp949로 재시도 (큰 파일은 CPU 프로세스 풀에서 실행)"""
+    from app.services.cpu_pool import decode_text
+
+    return decode_text(file_data)
@@ -0,0 +1,190 @@
+"""벡터 인덱스 프로필 - 벡터 압축, 정밀도, 저장 여부, HNSW 파라미터.
+
+기본값은 SEARCH_* 환경변수에서, 인덱스별 설정은 SEARCH_INDEX_PROFILES(JSON)에서 읽는다.
+
+- compression: none | scalar(int8, 약 4배 절감) | binary(1bit, 약 28배 절감)
+  압축 시 원본 벡터를 보존해 재채점(rescoring)하므로 정확도 손실이 작다.
+- vector_type: single(float32) | half(float16, 절반 크기)
+- stored: false면 원본 벡터를 조회용으로 저장하지 않는다 (벡터 포함 내보내기 불가)
+- hnsw_m / hnsw_ef_construction / hnsw_ef_search: HNSW 그래프 파라미터
+
+압축/정밀도/저장 여부는 기존 필드에서 바꿀 수 없으므로, 새 프로필의 인덱스를 만들고
+문서를 복사하는 방식으로 이전한다 (python -m app.tools.migrate_index).
+"""
+import json
+from typing import Dict, List
+
+from app.config import (
+    SEARCH_HNSW_EF_CONSTRUCTION,
+    SEARCH_HNSW_EF_SEARCH,
+    SEARCH_HNSW_M,
+    SEARCH_INDEX_PROFILES,
+    SEARCH_RESCORE_OVERSAMPLING,
+    SEARCH_VECTOR_COMPRESSION,
+    SEARCH_VECTOR_STORED,
+    SEARCH_VECTOR_TYPE,
+)
+from app.utils.logging_utils import safe_print
+
+VECTOR_FIELD = "content_vector"
+VECTOR_DIMENSIONS = 1536
+VECTOR_PROFILE_NAME = "my-vector-profile"
+HNSW_CONFIG_NAME = "my-hnsw"
+_COMPRESSION_NAMES = {"scalar": "scalar-compression", "binary": "binary-compression"}
+
+DEFAULT_PROFILE = {
+    "compression": SEARCH_VECTOR_COMPRESSION,
+    "vector_type": SEARCH_VECTOR_TYPE,
+    "stored": SEARCH_VECTOR_STORED,
+    "rescore_oversampling": SEARCH_RESCORE_OVERSAMPLING,
+    "hnsw_m": SEARCH_HNSW_M,
+    "hnsw_ef_construction": SEARCH_HNSW_EF_CONSTRUCTION,
+    "hnsw_ef_search": SEARCH_HNSW_EF_SEARCH,
+}
+
+
+def _load_overrides() -> Dict[str, dict]:
+    if not SEARCH_INDEX_PROFILES:
+        return {}
+    try:
+        return json.loads(SEARCH_INDEX_PROFILES)
+    except json.JSONDecodeError as e:
+        safe_print(f"⚠️  SEARCH_INDEX_PROFILES 파싱 실패 - 기본 프로필 사용: {e}")
+        return {}
+
+
+_overrides = _load_overrides()
+
+
+def get_index_profile(index_name: str) -> dict:
+    """인덱스에 적용할 프로필 (기본값 + 인덱스별 설정)."""
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(_overrides.get(index_name, {}))
+    if profile["compression"] not in ("none", "scalar", "binary"):
+        raise ValueError(f"지원하지 않는 벡터 압축 방식: {profile['compression']}")
+    if profile["vector_type"] not in ("single", "half"):
+        raise ValueError(f"지원하지 않는 벡터 타입: {profile['vector_type']}")
+    return profile
+
+
+def build_vector_field(profile: dict):
+    from azure.search.documents.indexes.models import SearchField, SearchFieldDataType
+
+    # SDK 버전마다 enum 이름이 달라 EDM 타입 문자열을 직접 사용
+    element_type = "Edm.Half" if profile["vector_type"] == "half" else "Edm.Single"
+    options = {}
+    if not profile["stored"]:
+        # 저장하지 않는 벡터는 조회도 불가 (stored=False는 retrievable=False 필요).
+        # stored는 SDK 11.6부터 있으므로 기본값(저장)이면 넘기지 않는다
+        options.update(hidden=True, stored=False)
+    return SearchField(
+        name=VECTOR_FIELD,
+        type=SearchFieldDataType.Collection(element_type),
+        searchable=True,
+        vector_search_dimensions=VECTOR_DIMENSIONS,
+        vector_search_profile_name=VECTOR_PROFILE_NAME,
+        **options
+    )
+
+
+def _rescoring_options(profile: dict):
+    from azure.search.documents.indexes.models import (
+        RescoringOptions,
+        VectorSearchCompressionRescoreStorageMethod,
+    )
+
+    # 압축 벡터로 후보를 넓게 찾은 뒤 보존된 원본 벡터로 재채점
+    return RescoringOptions(
+        enable_rescoring=True,
+        default_oversampling=float(profile["rescore_oversampling"]),
+        rescore_storage_method=VectorSearchCompressionRescoreStorageMethod.PRESERVE_ORIGINALS,
+    )
+
+
+def _build_compression(profile: dict, compression_name: str):
+    # 압축/재채점 모델은 SDK 11.6 이상에만 있으므로 압축을 쓸 때만 import
+    if profile["compression"] == "scalar":
+        from azure.search.documents.indexes.models import (
+            ScalarQuantizationCompression,
+            ScalarQuantizationParameters,
+        )
+
+        return ScalarQuantizationCompression(
+            compression_name=compression_name,
+            parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
+            rescoring_options=_rescoring_options(profile),
+        )
+    from azure.search.documents.indexes.models import BinaryQuantizationCompression
+
+    return BinaryQuantizationCompression(
+        compression_name=compression_name,
+        rescoring_options=_rescoring_options(profile),
+    )
+
+
+def build_vector_search(profile: dict):
+    from azure.search.documents.indexes.models import (
+        HnswAlgorithmConfiguration,
+        HnswParameters,
+        VectorSearch,
+        VectorSearchProfile,
+    )
+
+    compressions = []
+    compression_name = _COMPRESSION_NAMES.get(profile["compression"])
+    if compression_name:
+        compressions.append(_build_compression(profile, compression_name))
+
+    return VectorSearch(
+        algorithms=[
+            HnswAlgorithmConfiguration(
+                name=HNSW_CONFIG_NAME,
+                parameters=HnswParameters(
+                    m=int(profile["hnsw_m"]),
+                    ef_construction=int(profile["hnsw_ef_construction"]),
+                    ef_search=int(profile["hnsw_ef_search"]),
+                    metric="cosine",
+                ),
+            )
+        ],
+        compressions=compressions or None,
+        profiles=[
+            VectorSearchProfile(
+                name=VECTOR_PROFILE_NAME,
+                algorithm_configuration_name=HNSW_CONFIG_NAME,
+                compression_name=compression_name,
+            )
+        ]
+    )
+
+
+def describe_index(index) -> dict:
+    """기존 인덱스 정의에서 현재 벡터 프로필을 읽는다."""
+    vector_field = next((f for f in index.fields if f.name == VECTOR_FIELD), None)
+    vector_search = index.vector_search
+    compression = "none"
+    if vector_search is not None and vector_search.compressions:
+        kind = type(vector_search.compressions[0]).__name__
+        compression = "binary" if kind.startswith("Binary") else "scalar"
+    hnsw = None
+    if vector_search is not None and vector_search.algorithms:
+        hnsw = getattr(vector_search.algorithms[0], "parameters", None)
+    return {
+        "compression": compression,
+        "vector_type": "half" if vector_field is not None and "Half" in str(vector_field.type) else "single",
+        "stored": getattr(vector_field, "stored", None) is not False if vector_field is not None else True,
+        "hnsw_m": getattr(hnsw, "m", None),
+        "hnsw_ef_construction": getattr(hnsw, "ef_construction", None),
+        "hnsw_ef_search": getattr(hnsw, "ef_search", None),
+    }
+
+
+def profile_mismatches(index, profile: dict) -> List[str]:
+    """인덱스 정의와 프로필이 다른 항목 목록 (재생성/이전이 필요한 항목)."""
+    current = describe_index(index)
+    keys = ("compression", "vector_type", "stored", "hnsw_m", "hnsw_ef_construction", "hnsw_ef_search")
+    return [
+        f"{key}: {current[key]} → {profile[key]}"
+        for key in keys
+        if current[key] is not None and current[key] != profile[key]
+    ]
@@ -0,0 +1,420 @@
+"""인덱스 내보내기/가져오기/복사 - 임베딩을 다시 만들지 않는 대량 이전.
+
+- 내보내기: 인덱스를 다음 페이지 토큰(continuation token)으로 끝까지 읽어 스냅샷(gzip JSONL)으로 저장
+- 가져오기: 스냅샷을 읽어 대상 인덱스(현재 프로필로 생성)에 병렬 배치 업로드
+- 복사: 파일 없이 읽는 대로 대상 인덱스에 병렬 배치 업로드 (migrate_index도 이 경로 사용)
+
+스냅샷 형식: 첫 줄은 헤더({"format", "version", "index", "exported_at", "vector_field", ...}),
+이후 한 줄에 청크 하나, 마지막 줄은 끝 표시({"_snapshot_end": true, "count", "resumed"}).
+내보내기가 도중에 실패하면 끝 표시 대신 오류 표시({"_snapshot_error"})로 끝난다.
+가져오기는 업로드 전에 스냅샷 전체를 확인해 끝 표시가 없거나 잘린 파일은 거부한다.
+벡터는 float32 little-endian 바이트를 base64로 넣어("_vector") JSON 숫자 배열보다 3~4배 작다.
+중단된 내보내기/복사는 TransferInterrupted의 토큰으로 이어서 진행한다.
+"""
+import base64
+import gzip
+import json
+import sys
+import threading
+import time
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import INDEX_TRANSFER_BATCH_SIZE, INDEX_TRANSFER_CONCURRENCY
+from app.services.index_profiles import VECTOR_DIMENSIONS, VECTOR_FIELD, get_index_profile
+from app.services.search_service import (
+    create_index_if_not_exists,
+    get_search_client,
+    get_search_index_client,
+    iter_index_pages,
+)
+from app.utils.deadline import is_timeout_error
+from app.utils.logging_utils import log_exception, safe_print
+
+SNAPSHOT_FORMAT = "sweet-handover-index-snapshot"
+SNAPSHOT_VERSION = 1
+_VECTOR_KEY = "_vector"
+_KEY_FIELD = "id"
+_END_KEY = "_snapshot_end"
+_ERROR_KEY = "_snapshot_error"
+# 요청 본문 상한(16MB)보다 충분히 작게 - 문서 수와 별개로 배치 크기 제한
+_MAX_BATCH_BYTES = 8 * 1024 * 1024
+# 일시적 실패(스로틀링 등) 재시도 횟수와 첫 대기 시간(초, 시도마다 2배)
+_UPLOAD_RETRIES = 3
+_RETRY_BACKOFF = 1.0
+_RETRYABLE_STATUS = (409, 422, 429, 503)
+# 진행 상황 출력 간격 (문서 수)
+_PROGRESS_EVERY = 5000
+
+
+class TransferInterrupted(Exception):
+    """내보내기/복사 중단 - continuation_token으로 이어서 진행할 수 있다 (None이면 처음부터)."""
+
+    def __init__(self, message: str, continuation_token: Optional[str], stats: dict):
+        super().__init__(message)
+        self.continuation_token = continuation_token
+        self.stats = stats
+
+
+def encode_vector(vector: List[float]) -> str:
+    values = array("f", vector)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def decode_vector(encoded: str) -> List[float]:
+    values = array("f")
+    values.frombytes(base64.b64decode(encoded))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+def _readable_fields(index_name: str) -> List[str]:
+    """조회 가능한 필드 목록 - 벡터를 조회할 수 없는 인덱스는 임베딩 없이 옮길 수 없으므로 거부."""
+    index = get_search_index_client().get_index(index_name)
+    vector_field = next((f for f in index.fields if f.name == VECTOR_FIELD), None)
+    if vector_field is not None and (vector_field.hidden or vector_field.stored is False):
+        raise ValueError(f"'{index_name}'의 벡터 필드를 조회할 수 없어 옮길 수 없습니다 (stored/retrievable=false)")
+    return [f.name for f in index.fields if not f.hidden]
+
+
+def _encode_document(doc: dict) -> dict:
+    record = {key: value for key, value in doc.items() if value is not None}
+    vector = record.pop(VECTOR_FIELD, None)
+    if vector:
+        record[_VECTOR_KEY] = encode_vector(vector)
+    return record
+
+
+def _decode_document(record: dict, vector_field: str) -> dict:
+    doc = dict(record)
+    encoded = doc.pop(_VECTOR_KEY, None)
+    if encoded:
+        doc[vector_field] = decode_vector(encoded)
+    return doc
+
+
+def _snapshot_header(index_name: str, fields: List[str]) -> dict:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "index": index_name,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "fields": fields,
+        "vector_field": VECTOR_FIELD,
+        "vector_encoding": "base64-float32-le",
+        "dimensions": VECTOR_DIMENSIONS,
+        "profile": get_index_profile(index_name),
+    }
+
+
+def _json_line(value: dict) -> bytes:
+    return (json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+
+def _snapshot_end(count: int, resumed: bool) -> dict:
+    # 이어쓴 스냅샷은 마지막 실행에서 읽은 건수만 알고, 중단 지점 페이지가 중복될 수 있다
+    return {_END_KEY: True, "count": count, "resumed": resumed}
+
+
+def _iter_documents(index_name: str, fields: List[str], continuation_token: Optional[str], progress: dict):
+    """문서를 하나씩 넘겨주며 progress의 토큰/건수를 갱신 (중단 시 이어 읽을 위치).
+
+    토큰은 현재 페이지를 모두 넘겨준 뒤에야 다음 페이지 위치로 바뀌므로, 중단되면 마지막
+    페이지 일부가 다시 처리될 수 있다 (같은 id로 덮어쓰므로 결과는 같다).
+    """
+    progress["continuation_token"] = continuation_token
+    for docs, next_token in iter_index_pages(index_name, select=fields, continuation_token=continuation_token):
+        for doc in docs:
+            yield doc
+        progress["read"] += len(docs)
+        progress["continuation_token"] = next_token
+        if progress["read"] // _PROGRESS_EVERY != (progress["read"] - len(docs)) // _PROGRESS_EVERY:
+            safe_print(f"   ↪ {index_name}: {progress['read']}건 읽음")
+
+
+def iter_snapshot_chunks(index_name: str) -> Iterator[bytes]:
+    """스냅샷을 gzip 압축 바이트 조각으로 넘겨준다 (다운로드 스트리밍용)."""
+    fields = _readable_fields(index_name)
+    progress = {"read": 0, "continuation_token": None}
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip 헤더
+    pending = [compressor.compress(_json_line(_snapshot_header(index_name, fields)))]
+    pending_bytes = len(pending[0])
+    try:
+        for doc in _iter_documents(index_name, fields, None, progress):
+            part = compressor.compress(_json_line(_encode_document(doc)))
+            pending.append(part)
+            pending_bytes += len(part)
+            if pending_bytes >= 64 * 1024:
+                yield b"".join(pending)
+                pending, pending_bytes = [], 0
+    except Exception as e:
+        # 응답 상태 코드는 이미 나갔으므로 오류 표시로 스트림을 끝내 가져오기가 거부하도록 한다
+        log_exception(f"❌ 인덱스 내보내기 중단 (스트리밍, {index_name}): ", e)
+        pending.append(compressor.compress(_json_line({_ERROR_KEY: str(e), "read": progress["read"]})))
+        pending.append(compressor.flush())
+        yield b"".join(pending)
+        return
+    pending.append(compressor.compress(_json_line(_snapshot_end(progress["read"], False))))
+    pending.append(compressor.flush())
+    yield b"".join(pending)
+    safe_print(f"✅ 인덱스 내보내기 완료 (스트리밍): {index_name} ({progress['read']}건)")
+
+
+def export_index(index_name: str, path: str, continuation_token: Optional[str] = None) -> dict:
+    """인덱스를 스냅샷 파일로 저장. continuation_token이 있으면 기존 파일 뒤에 이어서 쓴다."""
+    fields = _readable_fields(index_name)
+    progress = {"read": 0, "continuation_token": continuation_token}
+    started = time.perf_counter()
+    safe_print(f"📤 인덱스 내보내기 시작: {index_name} → {path}")
+    # gzip은 여러 멤버를 이어 붙여도 하나의 스트림으로 읽히므로 이어쓰기는 추가 모드로 연다
+    with gzip.open(path, "ab" if continuation_token else "wb") as snapshot:
+        if not continuation_token:
+            snapshot.write(_json_line(_snapshot_header(index_name, fields)))
+        try:
+            for doc in _iter_documents(index_name, fields, continuation_token, progress):
+                snapshot.write(_json_line(_encode_document(doc)))
+            snapshot.write(_json_line(_snapshot_end(progress["read"], bool(continuation_token))))
+        except Exception as e:
+            log_exception(f"❌ 인덱스 내보내기 중단 ({index_name}): ", e)
+            raise TransferInterrupted(str(e), progress["continuation_token"], progress) from e
+    stats = {"index": index_name, "exported": progress["read"], "seconds": round(time.perf_counter() - started, 1)}
+    safe_print(f"✅ 인덱스 내보내기 완료: {index_name} ({stats['exported']}건, {stats['seconds']}초)")
+    return stats
+
+
+def _read_header(lines) -> dict:
+    header = json.loads(lines.readline() or b"{}")
+    if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("지원하지 않는 스냅샷 형식입니다")
+    return header
+
+
+def _verify_snapshot(fileobj: BinaryIO) -> int:
+    """스냅샷을 끝까지 읽어 완전한지 확인하고 문서 수를 반환 (잘림/오류 표시/끝 표시 누락 시 ValueError)."""
+    count, end = 0, None
+    try:
+        lines = gzip.GzipFile(fileobj=fileobj, mode="rb")
+        _read_header(lines)
+        for line in lines:
+            if not line.strip():
+                continue
+            if end is not None:
+                raise ValueError("스냅샷 끝 표시 뒤에 데이터가 있습니다")
+            record = json.loads(line)
+            if _ERROR_KEY in record:
+                raise ValueError(f"내보내기가 도중에 실패한 스냅샷입니다 ({record.get('read')}건 이후): {record[_ERROR_KEY]}")
+            if record.get(_END_KEY):
+                end = record
+            else:
+                count += 1
+    except (EOFError, zlib.error, gzip.BadGzipFile, json.JSONDecodeError) as e:
+        raise ValueError(f"스냅샷 파일이 잘렸거나 손상되었습니다: {e}") from e
+    if end is None:
+        raise ValueError("스냅샷 끝 표시가 없습니다 - 내보내기가 끝나지 않은 파일입니다")
+    expected = end.get("count", 0)
+    if count < expected or (count != expected and not end.get("resumed")):
+        raise ValueError(f"스냅샷 문서 수가 맞지 않습니다 (기록 {expected}건, 실제 {count}건)")
+    return count
+
+
+def read_snapshot(fileobj: BinaryIO) -> Tuple[dict, Iterator[dict]]:
+    """스냅샷(gzip JSONL) 헤더와 문서 이터레이터 - 먼저 전체를 확인하므로 fileobj는 되감을 수 있어야 한다."""
+    start = fileobj.tell()
+    _verify_snapshot(fileobj)
+    fileobj.seek(start)
+    lines = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    header = _read_header(lines)
+
+    def documents():
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                if record.get(_END_KEY):
+                    return
+                yield _decode_document(record, header.get("vector_field", VECTOR_FIELD))
+
+    return header, documents()
+
+
+def _estimated_size(doc: dict) -> int:
+    size = 256
+    for key, value in doc.items():
+        if key == VECTOR_FIELD:
+            size += len(value) * 12
+        elif isinstance(value, str):
+            size += len(value) * 3
+    return size
+
+
+def _batched(documents: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    batch, batch_bytes = [], 0
+    for doc in documents:
+        size = _estimated_size(doc)
+        if batch and (len(batch) >= batch_size or batch_bytes + size > _MAX_BATCH_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(doc)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def _send_batch(client, batch: List[dict]) -> List[str]:
+    """배치 업로드 - 일시적 실패는 재시도하고, 너무 큰 배치는 나눠 보낸다. 실패한 문서 오류 목록 반환."""
+    errors = []
+    for attempt in range(_UPLOAD_RETRIES + 1):
+        last_attempt = attempt == _UPLOAD_RETRIES
+        try:
+            results = client.merge_or_upload_documents(batch)
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            if status == 413 and len(batch) > 1:
+                middle = len(batch) // 2
+                return errors + _send_batch(client, batch[:middle]) + _send_batch(client, batch[middle:])
+            if last_attempt or not (status in _RETRYABLE_STATUS or is_timeout_error(e)):
+                return errors + [f"{doc.get(_KEY_FIELD)}: {e}" for doc in batch]
+            time.sleep(_RETRY_BACKOFF * 2 ** attempt)
+            continue
+
+        # 문서별 결과 - 재시도할 수 없는 실패는 기록하고, 일시적 실패 문서만 다시 보낸다
+        retry = set()
+        for r in results:
+            if r.succeeded:
+                continue
+            if r.status_code in _RETRYABLE_STATUS and not last_attempt:
+                retry.add(r.key)
+            else:
+                errors.append(f"{r.key}: {r.status_code} {r.error_message}")
+        if not retry:
+            return errors
+        batch = [doc for doc in batch if doc.get(_KEY_FIELD) in retry]
+        time.sleep(_RETRY_BACKOFF * 2 ** attempt)
+    return errors
+
+
+class _ParallelUploader:
+    """배치를 최대 concurrency개씩 병렬로 업로드하고 결과를 집계 (대상 인덱스는 현재 프로필로 생성)."""
+
+    def __init__(self, target_index: str, concurrency: int):
+        create_index_if_not_exists(target_index)
+        concurrency = max(1, concurrency)
+        self._target_index = target_index
+        self._client = get_search_client(target_index)
+        # 전송 중 + 대기 중 배치 수를 제한해 읽기가 업로드보다 빨라도 메모리가 늘지 않도록
+        self._slots = threading.BoundedSemaphore(concurrency * 2)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="index-transfer")
+        self._futures = []
+        self.stats = {"uploaded": 0, "failed": 0, "batches": 0, "errors": []}
+
+    def submit(self, batch: List[dict]) -> None:
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(self._send, batch))
+
+    def drain(self) -> None:
+        """지금까지 넣은 배치가 모두 끝날 때까지 대기."""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _send(self, batch: List[dict]) -> None:
+        try:
+            errors = _send_batch(self._client, batch)
+        except Exception as e:
+            errors = [f"{doc.get(_KEY_FIELD)}: {e}" for doc in batch]
+        finally:
+            self._slots.release()
+        with self._lock:
+            stats = self.stats
+            stats["batches"] += 1
+            stats["uploaded"] += len(batch) - len(errors)
+            stats["failed"] += len(errors)
+            # 오류 메시지는 앞부분만 보관
+            stats["errors"].extend(errors[:max(0, 20 - len(stats["errors"]))])
+            if stats["uploaded"] // _PROGRESS_EVERY != (stats["uploaded"] - len(batch)) // _PROGRESS_EVERY:
+                safe_print(f"   ↪ {self._target_index}: {stats['uploaded']}건 업로드됨")
+
+
+def upload_documents(
+    target_index: str,
+    documents: Iterable[dict],
+    batch_size: int = INDEX_TRANSFER_BATCH_SIZE,
+    concurrency: int = INDEX_TRANSFER_CONCURRENCY,
+) -> dict:
+    """문서를 배치로 묶어 최대 concurrency개씩 병렬 업로드."""
+    uploader = _ParallelUploader(target_index, concurrency)
+    try:
+        for batch in _batched(documents, max(1, batch_size)):
+            uploader.submit(batch)
+    finally:
+        uploader.close()
+    return uploader.stats
+
+
+def import_snapshot(
+    fileobj: BinaryIO,
+    target_index: str,
+    batch_size: int = INDEX_TRANSFER_BATCH_SIZE,
+    concurrency: int = INDEX_TRANSFER_CONCURRENCY,
+) -> dict:
+    """스냅샷을 target 인덱스에 업로드 (임베딩 재생성 없음)."""
+    header, documents = read_snapshot(fileobj)
+    started = time.perf_counter()
+    safe_print(f"📥 스냅샷 가져오기 시작: {header.get('index')} ({header.get('exported_at')}) → {target_index}")
+    stats = upload_documents(target_index, documents, batch_size, concurrency)
+    stats.update(source=header.get("index"), target=target_index, seconds=round(time.perf_counter() - started, 1))
+    safe_print(
+        f"✅ 스냅샷 가져오기 완료: {target_index} "
+        f"({stats['uploaded']}건 업로드, {stats['failed']}건 실패, {stats['seconds']}초)"
+    )
+    return stats
+
+
+def copy_index(
+    source_index: str,
+    target_index: str,
+    batch_size: int = INDEX_TRANSFER_BATCH_SIZE,
+    concurrency: int = INDEX_TRANSFER_CONCURRENCY,
+    continuation_token: Optional[str] = None,
+) -> dict:
+    """source 인덱스를 읽는 대로 target 인덱스에 병렬 업로드 (벡터 그대로, 임베딩 재생성 없음)."""
+    if source_index == target_index:
+        raise ValueError("source와 target 인덱스가 같습니다")
+    fields = _readable_fields(source_index)
+    progress = {"read": 0, "continuation_token": continuation_token}
+    started = time.perf_counter()
+    safe_print(f"🚚 인덱스 복사 시작: {source_index} → {target_index} (프로필: {get_index_profile(target_index)})")
+    uploader = _ParallelUploader(target_index, concurrency)
+    try:
+        pages = iter_index_pages(source_index, select=fields, continuation_token=continuation_token)
+        for docs, next_token in pages:
+            for batch in _batched(docs, max(1, batch_size)):
+                uploader.submit(batch)
+            # 이 페이지가 모두 업로드된 뒤에야 다음 위치를 기록 (이어서 진행할 때 빠지는 문서가 없도록)
+            uploader.drain()
+            progress["read"] += len(docs)
+            progress["continuation_token"] = next_token
+    except Exception as e:
+        log_exception(f"❌ 인덱스 복사 중단 ({source_index} → {target_index}): ", e)
+        raise TransferInterrupted(str(e), progress["continuation_token"], {**progress, **uploader.stats}) from e
+    finally:
+        uploader.close()
+    stats = uploader.stats
+    stats.update(
+        source=source_index, target=target_index, read=progress["read"],
+        seconds=round(time.perf_counter() - started, 1),
+    )
+    safe_print(
+        f"✅ 인덱스 복사 완료: {source_index} → {target_index} "
+        f"({stats['uploaded']}건 업로드, {stats['failed']}건 실패, {stats['seconds']}초)"
+    )
+    return stats
@@ -0,0 +1,230 @@
+"""문서 수집 파이프라인: Blob 업로드 → 텍스트 추출 → 임베딩/인덱싱.
+
+단일 업로드와 대량 업로드(여러 파일 또는 ZIP)가 같은 파이프라인을 사용한다.
+대량 업로드는 ZIP 항목을 하나씩 읽어 제한된 수의 작업 스레드로 처리하므로
+아카이브 전체를 메모리에 풀지 않는다.
+"""
+import hashlib
+import os
+import posixpath
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+from app.config import (
+    BULK_UPLOAD_CONCURRENCY,
+    BULK_UPLOAD_MAX_FILE_BYTES,
+    BULK_UPLOAD_MAX_FILES,
+)
+from app.services.blob_service import upload_to_blob
+from app.services.document_service import decode_text_file, extract_pages_from_url
+from app.services.search_service import add_document_to_index, make_document_id
+from app.utils.deadline import DeadlineExceeded
+from app.utils.logging_utils import log_exception, safe_print
+
+# ZIP 항목 중 건너뛸 경로 (macOS 메타데이터 등)
+_IGNORED_PREFIXES = ("__MACOSX/",)
+_IGNORED_NAMES = (".DS_Store", "Thumbs.db", "desktop.ini")
+
+
+def get_file_ext(file_name: str) -> str:
+    return file_name.lower().rsplit('.', 1)[-1] if '.' in file_name else ''
+
+
+def _page_offsets(pages: List[str]) -> List[int]:
+    offsets = []
+    position = 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page)
+    return offsets
+
+
+def extract_text(file_name: str, file_data: bytes, blob_url: str) -> Tuple[str, Optional[List[int]]]:
+    """파일 형식에 맞게 텍스트 추출. 실패 시 안내 문구로 대체한다.
+
+    두 번째 값은 텍스트 안에서 각 페이지가 시작하는 위치 (페이지 정보가 없으면 None).
+    """
+    if get_file_ext(file_name) == 'txt':
+        # txt 파일은 직접 디코딩
+        return decode_text_file(file_data), None
+
+    # PDF, 이미지 등은 Blob 업로드 후 Document Intelligence 사용
+    try:
+        if not blob_url:
+            raise Exception("Blob URL이 없습니다.")
+        safe_print(f"🔍 Document Intelligence로 텍스트 추출 시작: {file_name}")
+        pages = extract_pages_from_url(blob_url)
+        extracted_text = "".join(pages)
+        safe_print(f"✅ 텍스트 추출 완료: {file_name} ({len(extracted_text)} 글자, {len(pages)} 페이지)")
+        return extracted_text, _page_offsets(pages)
+    except DeadlineExceeded:
+        raise
+    except Exception as doc_error:
+        safe_print(f"⚠️  Document Intelligence 실패 ({file_name}): {doc_error}")
+        # Document Intelligence 실패 시 파일명과 기본 메시지로 폴백
+        return f"[파일명: {file_name}]\n[주의: 자동 텍스트 추출 실패. Document Intelligence 설정 필요]\n\n파일을 텍스트로 변환하여 업로드해주세요.", None
+
+
+def ingest_document(
+    file_name: str,
+    file_data: bytes,
+    target_indexes: List[str],
+    owner: Optional[str] = None,
+) -> dict:
+    """파일 하나를 Blob 업로드 → 텍스트 추출 → 인덱싱. 인덱싱 실패는 결과에 기록하고 계속한다."""
+    blob_url = None
+    try:
+        safe_print(f"📤 Blob 업로드 시도: {file_name}")
+        blob_url = upload_to_blob(file_name, file_data)
+        safe_print(f"✅ Blob 업로드 완료: {file_name}")
+    except DeadlineExceeded:
+        raise
+    except Exception as blob_error:
+        safe_print(f"⚠️  Blob 업로드 실패 ({file_name}): {blob_error}")
+
+    extracted_text, page_offsets = extract_text(file_name, file_data, blob_url)
+
+    # 검색 시 사전 필터로 쓸 문서 메타데이터
+    metadata = {
+        "file_type": get_file_ext(file_name) or None,
+        "owner": owner,
+        "uploaded_at": datetime.now(timezone.utc).isoformat(),
+        "content_hash": hashlib.sha256(file_data).hexdigest(),
+    }
+
+    # AI Search에 인덱싱 (실패해도 텍스트는 반환) - 같은 파일은 같은 문서 ID로 증분 갱신
+    doc_id = make_document_id(file_name)
+    index_error = None
+    index_stats = {}
+    try:
+        for target_index in target_indexes:
+            index_stats[target_index] = add_document_to_index(
+                doc_id, extracted_text, file_name, target_index,
+                metadata=metadata, page_offsets=page_offsets,
+            )
+        safe_print(f"✅ AI Search 인덱싱 완료: {file_name} ({len(target_indexes)}개)")
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        index_error = str(e)
+        safe_print(f"⚠️  AI Search 인덱싱 실패 (계속 진행): {file_name} - {e}")
+
+    return {
+        "file_name": file_name,
+        "doc_id": doc_id,
+        "extracted_text": extracted_text,
+        "blob_url": blob_url,
+        "index_names": target_indexes,
+        "index_stats": index_stats,
+        "index_error": index_error,
+        "metadata": metadata,
+    }
+
+
+def _zip_entry_name(info: zipfile.ZipInfo) -> str:
+    name = info.filename
+    # UTF-8 플래그가 없는 항목은 Windows 탐색기에서 만든 cp949 이름일 가능성이 높다
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode("cp437").decode("cp949")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return name
+
+
+def _safe_entry_path(name: str) -> str:
+    """ZIP 항목 경로를 Blob 이름으로 쓸 수 있게 정리 (절대 경로, .. 제거)."""
+    parts = [p for p in posixpath.normpath(name.replace("\\", "/")).split("/") if p not in ("", ".", "..")]
+    return "/".join(parts)
+
+
+def iter_upload_entries(
+    uploads: List[Tuple[str, BinaryIO]],
+) -> Iterator[Tuple[str, Callable[[], bytes], int]]:
+    """업로드된 파일 목록을 (파일명, 읽기 함수, 크기) 항목으로 펼친다. ZIP은 항목 단위로 펼친다."""
+    for file_name, fileobj in uploads:
+        if get_file_ext(file_name) != "zip":
+            fileobj.seek(0, os.SEEK_END)
+            size = fileobj.tell()
+            fileobj.seek(0)
+            yield file_name, fileobj.read, size
+            continue
+
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile as e:
+            def _raise(error=e):
+                raise error
+            yield file_name, _raise, 0
+            continue
+
+        with archive:
+            for info in archive.infolist():
+                name = _safe_entry_path(_zip_entry_name(info))
+                if info.is_dir() or not name:
+                    continue
+                if name.startswith(_IGNORED_PREFIXES) or posixpath.basename(name) in _IGNORED_NAMES:
+                    continue
+                yield name, (lambda info=info: archive.read(info)), info.file_size
+
+
+def ingest_many(
+    uploads: List[Tuple[str, BinaryIO]],
+    target_indexes: List[str],
+    concurrency: int = BULK_UPLOAD_CONCURRENCY,
+    owner: Optional[str] = None,
+) -> List[dict]:
+    """여러 파일/ZIP을 최대 concurrency개씩 병렬로 수집하고 파일별 결과를 반환."""
+    concurrency = max(1, concurrency)
+    # 작업 중 + 대기 중인 파일 수를 제한해 메모리에 올라가는 파일 데이터를 제한
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    # 입력 순서대로 결과를 돌려주기 위해 즉시 결과(dict)와 Future를 한 목록에 보관
+    pending = []
+
+    def run(file_name: str, file_data: bytes) -> dict:
+        try:
+            result = ingest_document(file_name, file_data, target_indexes, owner)
+            status = "indexed" if result["index_error"] is None else "index_failed"
+            return {
+                "file_name": file_name,
+                "status": status,
+                "doc_id": result["doc_id"],
+                "size": len(file_data),
+                "text_length": len(result["extracted_text"]),
+                "blob_url": result["blob_url"],
+                "index_stats": result["index_stats"],
+                "error": result["index_error"],
+            }
+        except Exception as e:
+            log_exception(f"❌ 파일 수집 실패 ({file_name}): ", e)
+            return {"file_name": file_name, "status": "failed", "size": len(file_data), "error": str(e)}
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest") as executor:
+        for count, (file_name, read, size) in enumerate(iter_upload_entries(uploads)):
+            if count >= BULK_UPLOAD_MAX_FILES:
+                pending.append({"file_name": file_name, "status": "skipped", "error": "최대 파일 수 초과"})
+                continue
+            if size > BULK_UPLOAD_MAX_FILE_BYTES:
+                pending.append({"file_name": file_name, "status": "skipped", "error": "파일 크기 제한 초과"})
+                continue
+            slots.acquire()
+            try:
+                file_data = read()
+            except Exception as e:
+                slots.release()
+                log_exception(f"❌ 파일 읽기 실패 ({file_name}): ", e)
+                pending.append({"file_name": file_name, "status": "failed", "error": str(e)})
+                continue
+            pending.append(executor.submit(run, file_name, file_data))
+
+    results = [item.result() if isinstance(item, Future) else item for item in pending]
+    safe_print(
+        f"📦 대량 업로드 완료 - 총 {len(results)}개, "
+        f"성공 {sum(1 for r in results if r['status'] == 'indexed')}개"
+    )
+    return results
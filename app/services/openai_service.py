@@ -1,31 +1,211 @@
+import hashlib
 import json
-from typing import List, Optional
-
-from openai import AzureOpenAI
-
-from app.config import AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional, Tuple
+
+from app.config import AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, EMBEDDING_CACHE_TTL
+from app.services.rate_limiter import (
+    PRIORITY_BULK,
+    PRIORITY_DEFAULT,
+    PRIORITY_INTERACTIVE,
+    RateLimitExceeded,
+    call_with_rate_limit,
+    estimate_tokens,
+    settle_tokens,
+)
+from app.services.state_store import cache_get, cache_set
+from app.utils.handover_schema import finalize_handover, validate_section
+from app.utils.json_stream import JsonObjectStream
+from app.utils.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    is_timeout_error,
+    stage_timeout,
+)
 from app.utils.logging_utils import log_exception, safe_print
+from app.utils.single_flight import make_key, single_flight
+
+CHAT_MODEL = "gpt-4o"
+EMBEDDING_MODEL = "text-embedding-ada-002"
 
+@lru_cache(maxsize=1)
 def get_openai_client():
+    # SDK는 첫 사용 시점에 import하고, 클라이언트는 연결 풀 재사용을 위해 캐시
+    # 재시도는 rate_limiter가 담당하므로 SDK 자체 재시도는 끈다
+    from openai import AzureOpenAI
+
     return AzureOpenAI(
         api_key=AZURE_OPENAI_API_KEY,
-        api_version="2024-02-15-preview",
-        azure_endpoint=AZURE_OPENAI_ENDPOINT
+        # stream_options(include_usage)를 지원하는 API 버전
+        api_version="2024-10-21",
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        max_retries=0
     )
 
-def get_embedding(text: str) -> list:
-    client = get_openai_client()
-    response = client.embeddings.create(
-        input=text,
-        model="text-embedding-ada-002"
+def _iter_stream(stream, usage: Optional[dict] = None):
+    """스트리밍 응답의 choice를 순서대로 넘겨준다.
+
+    청크마다 요청 마감/취소를 확인하고, 멈춰야 하면 연결을 닫아 남은 생성을 중단시킨다.
+    usage가 주어지면 마지막 청크(include_usage)의 토큰 사용량을 담는다.
+    """
+    # 생성 전체 시간도 LLM 단계 타임아웃(또는 남은 시간) 안으로 제한
+    give_up_at = time.monotonic() + stage_timeout("llm")
+    try:
+        for chunk in stream:
+            check_deadline("llm")
+            if time.monotonic() > give_up_at:
+                raise DeadlineExceeded("llm")
+            if usage is not None and getattr(chunk, "usage", None) is not None:
+                usage["total_tokens"] = chunk.usage.total_tokens
+            if chunk.choices:
+                yield chunk.choices[0]
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        if is_timeout_error(e):
+            raise DeadlineExceeded("llm") from e
+        raise
+    finally:
+        stream.close()
+
+def _iter_metered_stream(stream, model: str, kwargs: dict, estimated: int):
+    """_iter_stream + 끝나거나 중단되면 호출 제한기의 토큰 추정치를 실제 사용량으로 보정.
+
+    사용량을 받지 못했으면(생성 도중 중단 등) 프롬프트와 받은 텍스트로 센 추정치로 보정한다.
+    """
+    usage = {}
+    generated = []
+    try:
+        for choice in _iter_stream(stream, usage):
+            if choice.delta and choice.delta.content:
+                generated.append(choice.delta.content)
+            yield choice
+    finally:
+        actual = usage.get("total_tokens")
+        if actual is None:
+            actual = _estimate_prompt_tokens(kwargs) + estimate_tokens("".join(generated))
+        settle_tokens(model, estimated, actual)
+
+def _collect_stream(choices):
+    """스트리밍 응답을 모아 일반 응답과 같은 모양(choices[0].message.content)으로 반환."""
+    parts = []
+    finish_reason = None
+    for choice in choices:
+        if choice.delta and choice.delta.content:
+            parts.append(choice.delta.content)
+        finish_reason = choice.finish_reason or finish_reason
+    message = SimpleNamespace(role="assistant", content="".join(parts))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)], usage=None)
+
+def _estimate_prompt_tokens(kwargs: dict) -> int:
+    return sum(estimate_tokens(m["content"]) for m in kwargs["messages"])
+
+def _estimate_completion_tokens(kwargs: dict) -> int:
+    return _estimate_prompt_tokens(kwargs) + kwargs.get("max_tokens", 0)
+
+def _open_stream(client, priority: int, estimated: int, kwargs: dict):
+    """호출 제한기를 거쳐 스트리밍 chat completion을 열고, 사용량을 보정하는 choice 이터레이터 반환."""
+    stream = call_with_rate_limit(
+        kwargs["model"],
+        lambda timeout: client.chat.completions.with_raw_response.create(
+            stream=True, stream_options={"include_usage": True}, timeout=timeout, **kwargs
+        ),
+        estimated_tokens=estimated,
+        priority=priority,
     )
-    return response.data[0].embedding
+    return _iter_metered_stream(stream, kwargs["model"], kwargs, estimated)
 
-def analyze_files_for_handover(file_context: str, index_names: Optional[List[str]] = None) -> dict:
-    """파일 내용을 분석하여 인수인계서 JSON 생성 - 프론트엔드 HandoverData 형식으로 반환"""
-    from app.services.search_service import list_documents
+def _create_chat_completion(priority: int, **kwargs):
+    """호출 제한기를 거쳐 chat completion 생성 (max_tokens까지 토큰 예산에 포함).
 
+    요청 마감 시간이 있으면 스트리밍으로 받아, 클라이언트가 떠나거나 시간이 다 되면
+    생성 도중 연결을 끊어 남은 토큰을 쓰지 않는다.
+    """
     client = get_openai_client()
+    estimated = _estimate_completion_tokens(kwargs)
+    if current_deadline() is None:
+        return call_with_rate_limit(
+            kwargs["model"],
+            lambda timeout: client.chat.completions.with_raw_response.create(timeout=timeout, **kwargs),
+            estimated_tokens=estimated,
+            priority=priority,
+        )
+    return _collect_stream(_open_stream(client, priority, estimated, kwargs))
+
+def _stream_chat_completion(priority: int, **kwargs) -> Iterator[str]:
+    """호출 제한기를 거쳐 스트리밍 chat completion을 열고 생성되는 텍스트 조각을 넘겨준다."""
+    client = get_openai_client()
+    for choice in _open_stream(client, priority, _estimate_completion_tokens(kwargs), kwargs):
+        if choice.delta and choice.delta.content:
+            yield choice.delta.content
+
+def _embedding_cache_key(text: str) -> str:
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").split())
+
+@single_flight("embedding", lambda text, priority=PRIORITY_INTERACTIVE: make_key(text))
+def get_embedding(text: str, priority: int = PRIORITY_INTERACTIVE) -> list:
+    # 같은 텍스트의 임베딩은 워커 간 공유 캐시에서 재사용
+    cache_key = _embedding_cache_key(text)
+    if EMBEDDING_CACHE_TTL > 0:
+        cached = cache_get("embedding", cache_key)
+        if cached is not None:
+            return cached
+
+    client = get_openai_client()
+    response = call_with_rate_limit(
+        EMBEDDING_MODEL,
+        lambda timeout: client.embeddings.with_raw_response.create(
+            input=text, model=EMBEDDING_MODEL, timeout=timeout
+        ),
+        estimated_tokens=estimate_tokens(text),
+        priority=priority,
+        stage="embedding",
+    )
+    embedding = response.data[0].embedding
+    if EMBEDDING_CACHE_TTL > 0:
+        cache_set("embedding", cache_key, embedding, EMBEDDING_CACHE_TTL)
+    return embedding
+
+def get_embeddings(texts: List[str], priority: int = PRIORITY_BULK, batch_size: int = 16) -> List[list]:
+    """여러 텍스트의 임베딩을 배치 호출로 생성 (캐시에 있는 텍스트는 건너뜀)."""
+    embeddings: List[Optional[list]] = [None] * len(texts)
+    missing = []
+    for i, text in enumerate(texts):
+        cached = cache_get("embedding", _embedding_cache_key(text)) if EMBEDDING_CACHE_TTL > 0 else None
+        if cached is not None:
+            embeddings[i] = cached
+        else:
+            missing.append(i)
+
+    client = get_openai_client()
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        inputs = [texts[i] for i in batch]
+        response = call_with_rate_limit(
+            EMBEDDING_MODEL,
+            lambda timeout: client.embeddings.with_raw_response.create(
+                input=inputs, model=EMBEDDING_MODEL, timeout=timeout
+            ),
+            estimated_tokens=sum(estimate_tokens(text) for text in inputs),
+            priority=priority,
+            stage="embedding",
+        )
+        for item in response.data:
+            i = batch[item.index]
+            embeddings[i] = item.embedding
+            if EMBEDDING_CACHE_TTL > 0:
+                cache_set("embedding", _embedding_cache_key(texts[i]), item.embedding, EMBEDDING_CACHE_TTL)
+    return embeddings
+
+def _handover_context(file_context: str, index_names: Optional[List[str]] = None) -> str:
+    """인수인계서 생성용 자료 - 요청 본문 + 인덱스 문서 미리보기 (없으면 샘플 데이터)"""
+    from app.services.search_service import list_documents
 
     # Azure Search에서 모든 문서의 실제 내용 직접 검색
     safe_print("📄 Azure Search에서 모든 문서 검색 중...")
@@ -48,6 +228,8 @@ def analyze_files_for_handover(file_context: str, index_names: Optional[List[str
             file_context = indexed_context if not file_context else file_context + "\n\n---\n\n" + indexed_context
         else:
             safe_print("⚠️  검색 결과가 비어있음")
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         log_exception("⚠️  문서 검색 실패: ", e)
 
@@ -68,7 +250,9 @@ def analyze_files_for_handover(file_context: str, index_names: Optional[List[str
 다음 마일스톤: 2025-02-01 알파 테스트"""
 
     safe_print(f"📊 최종 컨텍스트 길이: {len(file_context)} 글자")
+    return file_context
 
+def _handover_messages(file_context: str) -> List[dict]:
     system_message = """
 당신은 인수인계서 생성 전문가입니다. 반드시 유효한 JSON 형식으로만 답변하세요.
 
@@ -129,60 +313,107 @@ def analyze_files_for_handover(file_context: str, index_names: Optional[List[str
 
 위의 JSON 형식을 반드시 따르세요.
 """
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_message}
+    ]
+
+# 인수인계서 생성 호출 옵션 (일반/스트리밍 공통)
+_HANDOVER_COMPLETION = {
+    "model": CHAT_MODEL,
+    "temperature": 0.7,
+    "max_tokens": 4000,
+    "response_format": {"type": "json_object"},
+}
+
+def _parse_handover(response_text: str) -> dict:
+    """응답 JSON 파싱 + 스키마 검증. 파싱 실패 시 빈 구조에 원문(rawContent)을 담아 반환."""
+    try:
+        safe_print("🔍 JSON 파싱 시도...")
+        result = json.loads(response_text)
+        if not isinstance(result, dict):
+            raise json.JSONDecodeError("최상위 값이 객체가 아님", response_text, 0)
+        safe_print(f"✅ JSON 파싱 성공 - 키: {list(result.keys())}")
+    except json.JSONDecodeError as e:
+        safe_print(f"⚠️  JSON 파싱 실패: {e}")
+        result = {"rawContent": response_text}
+    return finalize_handover(result)
+
+@single_flight(
+    "analyze",
+    lambda file_context, index_names=None: make_key(_normalize(file_context), sorted(index_names or [])),
+)
+def analyze_files_for_handover(file_context: str, index_names: Optional[List[str]] = None) -> dict:
+    """파일 내용을 분석하여 인수인계서 JSON 생성 - 프론트엔드 HandoverData 형식으로 반환"""
+    file_context = _handover_context(file_context, index_names)
 
     try:
         safe_print("🚀 Azure OpenAI 호출 시작...")
         safe_print(f"   - 엔드포인트: {AZURE_OPENAI_ENDPOINT}")
         safe_print(f"   - 컨텍스트 길이: {len(file_context)}")
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7,
-            max_tokens=4000,
-            response_format={"type": "json_object"}
+        response = _create_chat_completion(
+            PRIORITY_DEFAULT,
+            messages=_handover_messages(file_context),
+            **_HANDOVER_COMPLETION,
         )
 
         safe_print("✅ OpenAI 응답 수신")
         response_text = response.choices[0].message.content
         safe_print(f"   응답 길이: {len(response_text)} 글자")
-
-        # JSON 파싱 시도
-        try:
-            safe_print("🔍 JSON 파싱 시도...")
-            result = json.loads(response_text)
-            safe_print(f"✅ JSON 파싱 성공 - 키: {list(result.keys())}")
-            return result
-        except json.JSONDecodeError as e:
-            safe_print(f"⚠️  JSON 파싱 실패: {e}")
-            # JSON 파싱 실패 시 기본 구조 반환
-            return {
-                "overview": {
-                    "transferor": {"name": "", "position": "", "contact": ""},
-                    "transferee": {"name": "", "position": "", "contact": ""}
-                },
-                "jobStatus": {"title": "", "responsibilities": []},
-                "priorities": [],
-                "stakeholders": {"manager": "", "internal": [], "external": []},
-                "teamMembers": [],
-                "ongoingProjects": [],
-                "risks": {"issues": "", "risks": ""},
-                "roadmap": {"shortTerm": "", "longTerm": ""},
-                "resources": {"docs": [], "systems": [], "contacts": []},
-                "checklist": [],
-                "rawContent": response_text
-            }
+        return _parse_handover(response_text)
+    except (RateLimitExceeded, DeadlineExceeded):
+        raise
     except Exception as e:
         log_exception("❌ Azure OpenAI 호출 실패: ", e)
         # system_message 등 로컬 변수 참조 없이 에러만 반환
         raise Exception(f"API 에러: {e}")
 
-def chat_with_context(query: str, context: str) -> str:
-    client = get_openai_client()
+def stream_handover(file_context: str, index_names: Optional[List[str]] = None) -> Iterator[Tuple[str, Any]]:
+    """analyze_files_for_handover의 스트리밍 버전.
+
+    JSON 모드 응답을 받는 대로 점진 파싱해 최상위 섹션이 완성될 때마다
+    ("section", {"name", "value"})를 넘기고, 끝나면 전체 스키마 검증을 거친
+    ("done", 인수인계서)를 넘긴다. 요청마다 생성 과정이 다르므로 single-flight 병합은 하지 않는다.
+    """
+    file_context = _handover_context(file_context, index_names)
+    safe_print(f"🚀 Azure OpenAI 스트리밍 호출 시작 - 컨텍스트 길이: {len(file_context)}")
+    parser = JsonObjectStream()
+    sections = {}
+    try:
+        for text in _stream_chat_completion(
+            PRIORITY_DEFAULT,
+            messages=_handover_messages(file_context),
+            **_HANDOVER_COMPLETION,
+        ):
+            for name, value in parser.feed(text):
+                sections[name] = validate_section(name, value)
+                yield "section", {"name": name, "value": sections[name]}
+    except (RateLimitExceeded, DeadlineExceeded):
+        raise
+    except Exception as e:
+        log_exception("❌ Azure OpenAI 스트리밍 호출 실패: ", e)
+        raise Exception(f"API 에러: {e}")
 
+    safe_print(f"✅ OpenAI 스트리밍 응답 완료 - 길이: {len(parser.text)} 글자, 섹션 {len(sections)}개")
+    if parser.complete:
+        yield "done", _parse_handover(parser.text)
+    else:
+        # max_tokens 등으로 응답이 잘렸으면 완성된 섹션만 살리고 원문을 함께 넘긴다
+        safe_print("⚠️  JSON 응답이 완결되지 않음 - 완성된 섹션만 반환")
+        yield "done", finalize_handover({**sections, "rawContent": parser.text})
+
+@single_flight(
+    "chat",
+    lambda query, context, summary="", recent=None: make_key(_normalize(query), context, summary, recent),
+)
+def chat_with_context(
+    query: str,
+    context: str,
+    summary: str = "",
+    recent: Optional[List[dict]] = None,
+) -> str:
+    """검색 문서를 근거로 답변. summary/recent로 이전 대화 맥락을 함께 전달한다."""
     system_message = """당신은 '꿀단지' 인수인계서 생성 AI입니다. 🍯
 
 ## 핵심 원칙
@@ -213,13 +444,17 @@ def chat_with_context(query: str, context: str) -> str:
 
 위 문서 내용을 꼼꼼히 분석하여 질문에 답변해주세요. 문서에 있는 실제 정보를 인용해서 답변하세요."""
 
+    messages = [{"role": "system", "content": system_message}]
+    if summary:
+        messages.append({"role": "system", "content": f"[이전 대화 요약]\n{summary}"})
+    messages.extend(recent or [])
+    messages.append({"role": "user", "content": user_message})
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
+        response = _create_chat_completion(
+            PRIORITY_INTERACTIVE,
+            model=CHAT_MODEL,
+            messages=messages,
             temperature=0.7,
             max_tokens=4000
         )
@@ -228,3 +463,67 @@ def chat_with_context(query: str, context: str) -> str:
     except Exception as e:
         log_exception("Error in chat_with_context: ", e)
         raise
+
+def _format_turns(messages: List[dict]) -> str:
+    labels = {"user": "사용자", "assistant": "AI"}
+    return "\n".join(f"{labels.get(m['role'], m['role'])}: {m['content']}" for m in messages)
+
+def summarize_conversation(previous_summary: str, messages: List[dict], max_tokens: int) -> str:
+    """기존 요약에 새로 밀려난 대화를 합쳐 갱신된 요약 반환."""
+    system_message = (
+        "당신은 업무 인수인계 상담 대화를 요약하는 도우미입니다. "
+        "기존 요약과 새 대화를 합쳐 하나의 요약으로 작성하세요. "
+        "언급된 사람, 프로젝트, 문서명, 날짜, 결정 사항과 아직 답하지 못한 질문은 반드시 남기고, "
+        "인사말이나 반복된 내용은 제거하세요. 요약만 출력하세요."
+    )
+    user_message = f"""[기존 요약]
+{previous_summary or "(없음)"}
+
+[새 대화]
+{_format_turns(messages)}"""
+
+    response = _create_chat_completion(
+        PRIORITY_INTERACTIVE,
+        model=CHAT_MODEL,
+        messages=[
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ],
+        temperature=0.2,
+        max_tokens=max_tokens
+    )
+    return (response.choices[0].message.content or "").strip()
+
+def rewrite_standalone_query(query: str, summary: str, recent: List[dict]) -> str:
+    """이전 대화 맥락을 반영해 검색에 쓸 독립적인 질문으로 재작성."""
+    system_message = (
+        "대화 맥락을 참고해 마지막 질문을 그 자체로 이해 가능한 검색용 질문 한 문장으로 바꾸세요. "
+        "대명사와 생략된 대상은 구체적인 이름으로 바꾸고, 질문만 출력하세요."
+    )
+    user_message = f"""[대화 요약]
+{summary or "(없음)"}
+
+[최근 대화]
+{_format_turns(recent)}
+
+[마지막 질문]
+{query}"""
+
+    try:
+        response = _create_chat_completion(
+            PRIORITY_INTERACTIVE,
+            model=CHAT_MODEL,
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": user_message}
+            ],
+            temperature=0,
+            max_tokens=200
+        )
+        rewritten = (response.choices[0].message.content or "").strip()
+        return rewritten or query
+    except (RateLimitExceeded, DeadlineExceeded):
+        raise
+    except Exception as e:
+        log_exception("⚠️  질문 재작성 실패 - 원래 질문 사용: ", e)
+        return query
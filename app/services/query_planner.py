@@ -0,0 +1,77 @@
+"""검색 방식(keyword / vector / hybrid) 결정.
+
+auto는 질의 특징으로 방식을 고른다. 파일명, 이메일, 사번/티켓 번호 같은 식별자 위주 질의나
+따옴표로 묶은 문구, 한 단어짜리 질의는 정확히 일치하는 문서를 찾는 것이므로
+임베딩 호출 없이 키워드 검색만 한다. 그 밖의 자연어 질문은 하이브리드 검색을 쓴다.
+"""
+import re
+from typing import List
+
+SEARCH_MODES = ("keyword", "vector", "hybrid", "auto")
+
+# 경계는 ASCII 기준 - \b는 한글도 단어 문자로 보므로 "인수인계.pdf의", "DATA-123의"처럼
+# 조사가 바로 붙으면 일치하지 않는다
+_FILE_NAME = re.compile(
+    r"[\w가-힣().\-]+\.(?:pdf|docx?|xlsx?|pptx?|txt|csv|hwp|hwpx|json|md|png|jpe?g|zip)(?![A-Za-z0-9_])",
+    re.IGNORECASE,
+)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# 사번, 티켓/문서 번호 등: 숫자가 포함된 영문/숫자 토큰 (EMP-2024-001, DATA-123, A12345, 20240131)
+_TOKEN = re.compile(r"(?<![A-Za-z0-9_])[A-Za-z0-9][A-Za-z0-9_-]{3,}(?![A-Za-z0-9_])")
+_QUOTED = re.compile(r"\"([^\"]+)\"|“([^”]+)”|'([^']+)'")
+_SHORT_QUERY_MAX_CHARS = 20
+# 식별자 외 단어가 이보다 많으면 자연어 질문으로 보고 하이브리드 검색 ("gpt-4o 모델 설정 방법")
+_IDENTIFIER_QUERY_MAX_OTHER_WORDS = 2
+
+
+def _is_identifier(token: str) -> bool:
+    if not any(ch.isdigit() for ch in token):
+        return False
+    # 연도 같은 짧은 숫자(2025)는 식별자로 보지 않음
+    return not token.isdigit() or len(token) >= 5
+
+
+def _is_identifier_query(text: str) -> bool:
+    """식별자가 있고, 식별자를 포함하지 않은 단어가 몇 개 이하인 질의 ("DATA-123의 담당자는?")."""
+    words = text.split()
+    identifier_words = [
+        word for word in words
+        if any(_is_identifier(token) for token in _TOKEN.findall(word))
+    ]
+    return bool(identifier_words) and len(words) - len(identifier_words) <= _IDENTIFIER_QUERY_MAX_OTHER_WORDS
+
+
+def _plan(requested: str, mode: str, reason: str, file_names: List[str] = None) -> dict:
+    return {
+        "requested": requested,
+        "mode": mode,
+        "reason": reason,
+        "embedding": mode != "keyword",
+        "file_names": file_names or [],
+    }
+
+
+def plan_query(query: str, mode: str = "auto") -> dict:
+    """질의에 적용할 검색 계획.
+
+    반환값: requested(요청 방식), mode(실제 방식), reason, embedding(임베딩 호출 여부),
+    file_names(질의에서 찾은 파일명 - 키워드 검색 시 파일명 필터로 우선 시도)
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"지원하지 않는 검색 방식: {mode} ({', '.join(SEARCH_MODES)})")
+    if mode != "auto":
+        return _plan(mode, mode, "requested")
+
+    text = " ".join(query.split())
+    file_names = _FILE_NAME.findall(text)
+    if file_names:
+        return _plan(mode, "keyword", "file_name", file_names)
+    if _EMAIL.search(text):
+        return _plan(mode, "keyword", "email")
+    if _is_identifier_query(text):
+        return _plan(mode, "keyword", "identifier")
+    if _QUOTED.search(text):
+        return _plan(mode, "keyword", "quoted_phrase")
+    if len(text.split()) == 1 and len(text) <= _SHORT_QUERY_MAX_CHARS:
+        return _plan(mode, "keyword", "short_query")
+    return _plan(mode, "hybrid", "natural_language")
@@ -0,0 +1,288 @@
+"""Azure OpenAI 호출용 클라이언트 측 호출 제한기.
+
+배포(deployment)마다 분당 요청 수와 토큰 수를 토큰 버킷으로 관리하고,
+응답 헤더(x-ratelimit-remaining-*)로 서버가 알려준 잔여량에 맞춰 보정한다.
+한도를 넘는 요청은 우선순위 순으로 대기열에서 기다리며(최대 RATE_LIMIT_MAX_WAIT초),
+429/5xx 응답은 지터가 섞인 지수 백오프로 재시도한다.
+요청 마감 시간(app.utils.deadline)이 있으면 대기와 재시도도 그 안에서만 하고,
+취소되면 대기 중이라도 바로 멈춘다.
+"""
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from app.config import (
+    AZURE_OPENAI_LIMITS,
+    AZURE_OPENAI_RPM_LIMIT,
+    AZURE_OPENAI_TPM_LIMIT,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_MAX_WAIT,
+)
+from app.utils.deadline import (
+    POLL_INTERVAL,
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    is_timeout_error,
+    stage_timeout,
+)
+from app.utils.logging_utils import safe_print
+
+# 숫자가 작을수록 먼저 처리 - 대화형 /chat이 대량 임베딩보다 앞선다
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 10
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_MAX = 20.0
+
+
+class RateLimitExceeded(Exception):
+    """대기 한도 안에 호출 예산을 확보하지 못했거나 재시도를 모두 소진한 경우."""
+
+    def __init__(self, deployment: str, retry_after: float):
+        super().__init__(
+            f"Azure OpenAI 호출 한도 초과 ({deployment}) - {retry_after:.1f}초 후 다시 시도하세요"
+        )
+        self.deployment = deployment
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 보수적으로 추정 (한글은 UTF-8 3바이트 ≈ 1토큰)."""
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+class DeploymentLimiter:
+    """배포 하나의 요청/토큰 버킷과 우선순위 대기열."""
+
+    def __init__(self, name: str, rpm: int, tpm: int):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        waits = [self._blocked_until - now]
+        if self._requests < 1:
+            waits.append((1 - self._requests) * 60.0 / self.rpm)
+        if self._tokens < tokens:
+            waits.append((tokens - self._tokens) * 60.0 / self.tpm)
+        return max(waits)
+
+    def acquire(self, tokens: int, priority: int, max_wait: float, deadline: Optional[Deadline] = None) -> None:
+        """예산을 확보할 때까지 대기. max_wait 초과 시 RateLimitExceeded.
+
+        deadline이 있으면 주기적으로 취소/만료를 확인하고, 마감이 먼저 오면 DeadlineExceeded.
+        """
+        tokens = min(tokens, self.tpm)
+        entry = (priority, next(self._seq))
+        give_up_at = time.monotonic() + max_wait
+        if deadline is not None:
+            give_up_at = min(give_up_at, deadline.expires_at)
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_time(tokens, now)
+                    if self._waiters[0] == entry and wait <= 0:
+                        self._requests -= 1
+                        self._tokens -= tokens
+                        return
+                    if deadline is not None:
+                        deadline.check()
+                    remaining = give_up_at - now
+                    if remaining <= 0:
+                        if deadline is not None and give_up_at >= deadline.expires_at:
+                            raise DeadlineExceeded(deadline.stage)
+                        raise RateLimitExceeded(self.name, max(wait, 1.0))
+                    # 앞선 대기자가 있으면 통지를 받을 때까지, 아니면 예산이 찰 때까지 대기
+                    timeout = min(remaining, wait if wait > 0 else remaining)
+                    if deadline is not None:
+                        timeout = min(timeout, POLL_INTERVAL)
+                    self._cond.wait(timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """실제 사용 토큰으로 추정치를 보정."""
+        if actual is None:
+            return
+        with self._cond:
+            self._tokens = min(self.tpm, self._tokens + estimated - actual)
+            self._cond.notify_all()
+
+    def update_from_headers(self, headers) -> None:
+        """응답 헤더의 잔여 한도가 로컬 버킷보다 작으면 서버 값을 따른다."""
+        if headers is None:
+            return
+        with self._cond:
+            remaining_requests = _header_number(headers, "x-ratelimit-remaining-requests")
+            remaining_tokens = _header_number(headers, "x-ratelimit-remaining-tokens")
+            if remaining_requests is not None:
+                self._requests = min(self._requests, remaining_requests)
+            if remaining_tokens is not None:
+                self._tokens = min(self._tokens, remaining_tokens)
+
+    def block_for(self, seconds: float) -> None:
+        """429 응답 후 retry-after 동안 모든 호출을 멈춘다."""
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "available_requests": round(self._requests, 1),
+                "available_tokens": round(self._tokens),
+                "waiting": len(self._waiters),
+            }
+
+
+def _header_number(headers, name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    if headers is None:
+        return None
+    retry_after_ms = _header_number(headers, "retry-after-ms")
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000.0
+    return _header_number(headers, "retry-after")
+
+
+def _load_limit_overrides() -> Dict[str, dict]:
+    if not AZURE_OPENAI_LIMITS:
+        return {}
+    try:
+        return json.loads(AZURE_OPENAI_LIMITS)
+    except json.JSONDecodeError as e:
+        safe_print(f"⚠️  AZURE_OPENAI_LIMITS 파싱 실패 - 기본 한도 사용: {e}")
+        return {}
+
+
+_limiters: Dict[str, DeploymentLimiter] = {}
+_limiters_lock = threading.Lock()
+_overrides = _load_limit_overrides()
+
+
+def get_limiter(deployment: str) -> DeploymentLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(deployment)
+        if limiter is None:
+            override = _overrides.get(deployment, {})
+            limiter = DeploymentLimiter(
+                deployment,
+                rpm=int(override.get("rpm", AZURE_OPENAI_RPM_LIMIT)),
+                tpm=int(override.get("tpm", AZURE_OPENAI_TPM_LIMIT)),
+            )
+            _limiters[deployment] = limiter
+        return limiter
+
+
+def settle_tokens(deployment: str, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+    """스트리밍 응답을 다 읽은 뒤 예약한 추정치를 실제 사용량으로 보정."""
+    get_limiter(deployment).settle(estimated_tokens, actual_tokens)
+
+
+def get_rate_limit_stats() -> dict:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def _is_retryable(error: Exception) -> bool:
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def call_with_rate_limit(
+    deployment: str,
+    call: Callable,
+    estimated_tokens: int,
+    priority: int = PRIORITY_DEFAULT,
+    stage: str = "llm",
+):
+    """호출 예산을 확보한 뒤 call(timeout)을 실행하고, 429/5xx/타임아웃은 백오프 후 재시도.
+
+    call은 timeout(초)을 받아 openai의 with_raw_response 응답을 반환해야 하며,
+    헤더로 한도를 보정한 뒤 parse()된 결과를 돌려준다. timeout은 stage의 타임아웃과
+    요청 마감까지 남은 시간 중 짧은 값이다. 스트리밍 응답은 사용량이 끝에 오므로
+    추정치를 유지한 채 반환하고, 호출한 쪽이 다 읽은 뒤 settle_tokens로 보정한다.
+    """
+    limiter = get_limiter(deployment)
+    deadline = current_deadline()
+    attempt = 0
+    while True:
+        # 대기 전에 취소/만료 확인 (단계 이름도 기록)
+        stage_timeout(stage)
+        limiter.acquire(estimated_tokens, priority, RATE_LIMIT_MAX_WAIT, deadline)
+        try:
+            raw = call(stage_timeout(stage))
+        except DeadlineExceeded:
+            limiter.settle(estimated_tokens, 0)
+            raise
+        except Exception as e:
+            limiter.settle(estimated_tokens, 0)
+            if not _is_retryable(e) or attempt >= RATE_LIMIT_MAX_RETRIES:
+                if getattr(e, "status_code", None) == 429:
+                    retry_after = _retry_after_seconds(getattr(e.response, "headers", None))
+                    raise RateLimitExceeded(deployment, retry_after or _BACKOFF_MAX) from e
+                if is_timeout_error(e):
+                    raise DeadlineExceeded(stage) from e
+                raise
+            headers = getattr(getattr(e, "response", None), "headers", None)
+            retry_after = _retry_after_seconds(headers)
+            backoff = min(_BACKOFF_MAX, _BACKOFF_BASE * (2 ** attempt))
+            # full jitter - 여러 워커가 동시에 재시도하며 다시 한도를 넘지 않도록 분산
+            delay = max(retry_after or 0.0, random.uniform(0, backoff))
+            if getattr(e, "status_code", None) == 429:
+                limiter.block_for(delay)
+            attempt += 1
+            safe_print(
+                f"⏳ Azure OpenAI 재시도 {attempt}/{RATE_LIMIT_MAX_RETRIES} "
+                f"({deployment}, {delay:.1f}초 후): {e}"
+            )
+            if deadline is not None:
+                deadline.sleep(delay, stage)
+            else:
+                time.sleep(delay)
+            continue
+
+        limiter.update_from_headers(raw.headers)
+        response = raw.parse()
+        usage = getattr(response, "usage", None)
+        limiter.settle(estimated_tokens, getattr(usage, "total_tokens", None))
+        return response
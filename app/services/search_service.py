@@ -1,54 +1,90 @@
-from azure.search.documents import SearchClient
-from azure.search.documents.indexes import SearchIndexClient
-from azure.search.documents.indexes.models import (
-    SearchIndex,
-    SimpleField,
-    SearchableField,
-    SearchFieldDataType,
-    VectorSearch,
-    HnswAlgorithmConfiguration,
-    VectorSearchProfile,
-    SearchField
+from app.config import (
+    AZURE_SEARCH_ENDPOINT,
+    AZURE_SEARCH_KEY,
+    CHUNK_MAX_CHARS,
+    CHUNK_MIN_CHARS,
+    SEARCH_DEFAULT_MODE,
 )
-from azure.core.credentials import AzureKeyCredential
-from app.config import AZURE_SEARCH_ENDPOINT, AZURE_SEARCH_KEY
+import bisect
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List, Optional
 
-from app.services.openai_service import get_embedding
+from app.services.blob_service import CONTAINER_NAME
+from app.services.cpu_pool import chunk_document
+from app.services.index_profiles import (
+    VECTOR_FIELD,
+    build_vector_field,
+    build_vector_search,
+    get_index_profile,
+    profile_mismatches,
+)
+from app.services.openai_service import get_embedding, get_embeddings
+from app.services.query_planner import plan_query
+from app.services.rate_limiter import PRIORITY_BULK
+from app.services.state_store import get_state_store
+from app.utils.deadline import DeadlineExceeded, azure_timeouts, stage
 from app.utils.logging_utils import log_exception, safe_print
+from app.utils.single_flight import make_key, single_flight
 
-# 현재 선택된 인덱스 (기본값)
+# 기본 인덱스 - 선택된 인덱스는 워커 간 공유 저장소에 보관
 INDEX_NAME = "documents-index"
-_current_index = INDEX_NAME
+_DEFAULT_SESSION = "default"
+# 업로드/삭제 배치 크기 (Azure AI Search 요청당 최대 1000건)
+_UPLOAD_BATCH_SIZE = 500
+
+def _current_index_key(session_id: Optional[str]) -> str:
+    return f"current_index:{session_id or _DEFAULT_SESSION}"
 
-def set_current_index(index_name: str):
-    """현재 사용할 인덱스 설정"""
-    global _current_index
-    _current_index = index_name
-    safe_print(f"🔄 현재 인덱스 변경: {index_name}")
+def set_current_index(index_name: str, session_id: Optional[str] = None):
+    """현재 사용할 인덱스 설정 (session_id가 없으면 전체 기본값 변경)"""
+    get_state_store().set(_current_index_key(session_id), index_name)
+    safe_print(f"🔄 현재 인덱스 변경: {index_name} (session={session_id or _DEFAULT_SESSION})")
 
-def get_current_index() -> str:
-    """현재 선택된 인덱스 이름 반환"""
-    return _current_index
+def get_current_index(session_id: Optional[str] = None) -> str:
+    """현재 선택된 인덱스 이름 반환 - 세션 선택 > 전체 기본값 > INDEX_NAME 순"""
+    store = get_state_store()
+    try:
+        if session_id:
+            selected = store.get(_current_index_key(session_id))
+            if selected:
+                return selected
+        return store.get(_current_index_key(None)) or INDEX_NAME
+    except Exception as e:
+        log_exception("⚠️  현재 인덱스 조회 실패 - 기본 인덱스 사용: ", e)
+        return INDEX_NAME
 
+# Azure SDK는 첫 사용 시점에 import하고, 클라이언트는 연결 풀 재사용을 위해 캐시
+@lru_cache(maxsize=1)
 def get_search_index_client():
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents.indexes import SearchIndexClient
+
     return SearchIndexClient(
         endpoint=AZURE_SEARCH_ENDPOINT,
         credential=AzureKeyCredential(AZURE_SEARCH_KEY)
     )
 
-def get_search_client(index_name: str = None):
-    """지정된 인덱스 또는 현재 선택된 인덱스의 SearchClient 반환"""
-    target_index = index_name or _current_index
+@lru_cache(maxsize=64)
+def _search_client_for(index_name: str):
+    from azure.core.credentials import AzureKeyCredential
+    from azure.search.documents import SearchClient
+
     return SearchClient(
         endpoint=AZURE_SEARCH_ENDPOINT,
-        index_name=target_index,
+        index_name=index_name,
         credential=AzureKeyCredential(AZURE_SEARCH_KEY)
     )
 
-def list_all_indexes():
+def get_search_client(index_name: str = None):
+    """지정된 인덱스 또는 현재 선택된 인덱스의 SearchClient 반환"""
+    return _search_client_for(index_name or get_current_index())
+
+def list_all_indexes(session_id: Optional[str] = None):
     """Azure AI Search의 모든 인덱스 목록 조회"""
     try:
+        current_index = get_current_index(session_id)
         index_client = get_search_index_client()
         indexes = list(index_client.list_indexes())
         result = []
@@ -56,7 +92,13 @@ def list_all_indexes():
             # 각 인덱스의 문서 개수 조회
             try:
                 search_client = get_search_client(idx.name)
-                results = search_client.search(search_text="*", include_total_count=True, top=1)
+                has_chunks = any(field.name == "chunk_index" for field in idx.fields)
+                results = search_client.search(
+                    search_text="*",
+                    filter=_FIRST_CHUNK_FILTER if has_chunks else None,
+                    include_total_count=True,
+                    top=1
+                )
                 doc_count = results.get_count() or 0
             except:
                 doc_count = 0
@@ -64,7 +106,7 @@ def list_all_indexes():
             result.append({
                 "name": idx.name,
                 "document_count": doc_count,
-                "is_current": idx.name == _current_index
+                "is_current": idx.name == current_index
             })
         safe_print(f"📚 인덱스 목록 조회: {len(result)}개")
         return result
@@ -72,96 +114,465 @@ def list_all_indexes():
         log_exception("❌ 인덱스 목록 조회 실패: ", e)
         return []
 
+def _build_index_fields(index_name: str) -> list:
+    """인덱스 스키마 필드 정의 - 새 필드는 기존 인덱스에도 _ensure_index_fields로 추가된다."""
+    from azure.search.documents.indexes.models import (
+        SearchableField,
+        SearchFieldDataType,
+        SimpleField,
+    )
+
+    return [
+        # 키는 정렬/필터 가능 - 대량 조회를 키 범위로 페이지 나눔 (건너뛰기 상한 없음)
+        SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True, sortable=True),
+        SearchableField(name="content", type=SearchFieldDataType.String),
+        SimpleField(name="file_name", type=SearchFieldDataType.String, filterable=True),
+        # 문서 단위 식별자와 청크 정보 (증분 재인덱싱용)
+        SimpleField(name="doc_id", type=SearchFieldDataType.String, filterable=True),
+        SimpleField(name="chunk_index", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
+        SimpleField(name="chunk_hash", type=SearchFieldDataType.String, filterable=True),
+        SimpleField(name="version", type=SearchFieldDataType.Int32, filterable=True),
+        # 검색 사전 필터/패싯용 메타데이터
+        SimpleField(name="file_type", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SimpleField(name="owner", type=SearchFieldDataType.String, filterable=True, facetable=True),
+        SimpleField(
+            name="uploaded_at", type=SearchFieldDataType.DateTimeOffset,
+            filterable=True, sortable=True, facetable=True
+        ),
+        SimpleField(name="content_hash", type=SearchFieldDataType.String, filterable=True),
+        SimpleField(name="page_start", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
+        SimpleField(name="page_end", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
+        # 벡터 타입/저장 여부는 인덱스 프로필에 따름
+        build_vector_field(get_index_profile(index_name)),
+    ]
+
+# 이 프로세스에서 스키마를 확인한 인덱스 (매 업로드마다 get_index 호출 방지)
+_ensured_indexes = set()
+
+def _ensure_index_fields(index_client, index) -> None:
+    """기존 인덱스에 없는 필드를 추가 (Azure AI Search는 필드 추가만 허용)."""
+    mismatches = profile_mismatches(index, get_index_profile(index.name))
+    if mismatches:
+        safe_print(
+            f"ℹ️  인덱스 '{index.name}'가 설정된 벡터 프로필과 다릅니다 ({', '.join(mismatches)}) - "
+            "적용하려면 python -m app.tools.migrate_index로 새 인덱스에 옮기세요"
+        )
+    existing = {field.name for field in index.fields}
+    missing = [field for field in _build_index_fields(index.name) if field.name not in existing]
+    if not missing:
+        return
+    index.fields.extend(missing)
+    index_client.create_or_update_index(index)
+    safe_print(f"🧩 인덱스 스키마 갱신 ({index.name}): {[field.name for field in missing]} 추가")
+
 def create_index_if_not_exists(index_name: str = None):
-    target_index = index_name or _current_index
+    target_index = index_name or get_current_index()
+    if target_index in _ensured_indexes:
+        return
     index_client = get_search_index_client()
 
     try:
-        index_client.get_index(target_index)
-        return
+        index = index_client.get_index(target_index)
     except Exception:
-        pass
+        index = None
 
-    fields = [
-        SimpleField(name="id", type=SearchFieldDataType.String, key=True),
-        SearchableField(name="content", type=SearchFieldDataType.String),
-        SimpleField(name="file_name", type=SearchFieldDataType.String, filterable=True),
-        SearchField(
-            name="content_vector",
-            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
-            searchable=True,
-            vector_search_dimensions=1536,
-            vector_search_profile_name="my-vector-profile"
+    if index is not None:
+        _ensure_index_fields(index_client, index)
+        _ensured_indexes.add(target_index)
+        _index_field_cache.pop(target_index, None)
+        return
+
+    from azure.search.documents.indexes.models import SearchIndex
+
+    profile = get_index_profile(target_index)
+    index = SearchIndex(
+        name=target_index,
+        fields=_build_index_fields(target_index),
+        vector_search=build_vector_search(profile)
+    )
+    index_client.create_index(index)
+    _ensured_indexes.add(target_index)
+    safe_print(f"🆕 인덱스 생성 ({target_index}): {profile}")
+
+def migrate_index(source_index: str, target_index: str, batch_size: int = _UPLOAD_BATCH_SIZE) -> int:
+    """source 인덱스의 문서를 벡터 그대로 target 인덱스(현재 프로필로 생성)에 복사.
+
+    압축/정밀도 변경은 기존 인덱스에 적용할 수 없으므로 새 인덱스로 옮긴 뒤 전환한다.
+    임베딩을 다시 만들지 않으므로 source의 벡터 필드가 조회 가능해야 한다.
+    """
+    from app.services.index_transfer_service import copy_index
+
+    stats = copy_index(source_index, target_index, batch_size=batch_size)
+    if stats["failed"]:
+        # 일부만 복사된 인덱스로 전환되지 않도록 실패로 처리
+        raise RuntimeError(
+            f"인덱스 이전 중 {stats['failed']}건 업로드 실패 ({source_index} → {target_index}): "
+            f"{'; '.join(stats['errors'][:3])}"
         )
-    ]
+    return stats["uploaded"]
 
-    vector_search = VectorSearch(
-        algorithms=[
-            HnswAlgorithmConfiguration(name="my-hnsw")
-        ],
-        profiles=[
-            VectorSearchProfile(
-                name="my-vector-profile",
-                algorithm_configuration_name="my-hnsw"
-            )
-        ]
+# 페이지 크기 (검색 서비스의 한 응답 최대 건수)
+_PAGE_SIZE = 1000
+# $skip 상한 - 키로 정렬할 수 없는 예전 인덱스는 건너뛰기로 페이지를 나누므로 이만큼만 읽을 수 있다
+_MAX_SKIP = 100000
+# 키 범위 페이지 토큰 접두어 (SDK 토큰은 base64라 ':'가 없어 구분된다)
+_KEY_TOKEN_PREFIX = "after:"
+
+def _paging_schema(index_name: str):
+    """(키 필드 이름, 키로 정렬/필터 가능한지, 정렬 가능한 필드 목록)"""
+    index = get_search_index_client().get_index(index_name)
+    key = next(field for field in index.fields if field.key)
+    sortable = [field.name for field in index.fields if field.sortable]
+    return key.name, bool(key.sortable and key.filterable), sortable
+
+def _strip_search_keys(page) -> List[dict]:
+    return [{key: value for key, value in item.items() if not key.startswith("@search.")} for item in page]
+
+def _and_filter(*expressions: Optional[str]) -> Optional[str]:
+    parts = [f"({expression})" for expression in expressions if expression]
+    return " and ".join(parts) or None
+
+def iter_index_pages(
+    index_name: str,
+    select: Optional[List[str]] = None,
+    filter_expression: Optional[str] = None,
+    continuation_token: Optional[str] = None,
+):
+    """인덱스 문서를 페이지 단위로 조회 - (문서 목록, 다음 페이지 토큰)을 차례로 넘겨준다.
+
+    마지막 페이지의 토큰은 None. 중단된 조회는 받은 토큰을 continuation_token으로 넘겨 이어서 읽는다.
+    키가 정렬 가능한 인덱스는 키 순서로 "키 > 마지막 키" 필터를 걸어 끝까지 읽는다.
+    예전 인덱스는 건너뛰기($skip)로 읽으므로, 문서가 100,000건을 넘으면 잘린 결과 대신 오류를 낸다.
+    """
+    key_field, key_paging, sortable = _paging_schema(index_name)
+    search_client = get_search_client(index_name)
+    if key_paging:
+        if select is not None and key_field not in select:
+            select = [*select, key_field]
+        last_key = continuation_token[len(_KEY_TOKEN_PREFIX):] if continuation_token else None
+        while True:
+            with stage("search") as timeout:
+                key_filter = f"{key_field} gt {_odata_string(last_key)}" if last_key is not None else None
+                docs = _strip_search_keys(search_client.search(
+                    search_text="*",
+                    select=select,
+                    filter=_and_filter(filter_expression, key_filter),
+                    order_by=[f"{key_field} asc"],
+                    top=_PAGE_SIZE,
+                    **azure_timeouts(timeout)
+                ))
+            if not docs:
+                return
+            last_key = docs[-1][key_field]
+            next_token = f"{_KEY_TOKEN_PREFIX}{last_key}" if len(docs) == _PAGE_SIZE else None
+            yield docs, next_token
+            if next_token is None:
+                return
+
+    if continuation_token and continuation_token.startswith(_KEY_TOKEN_PREFIX):
+        raise ValueError(f"'{index_name}'은 키 범위 페이지 토큰을 쓸 수 없는 인덱스입니다")
+    # 키로 정렬할 수 없으면 정렬 가능한 필드로 순서를 고정 (값이 같은 문서끼리는 서비스 순서)
+    order_by = [f"{name} asc" for name in ("uploaded_at", "doc_id", "chunk_index") if name in sortable] or None
+    with stage("search") as timeout:
+        results = search_client.search(
+            search_text="*",
+            select=select,
+            filter=filter_expression,
+            order_by=order_by,
+            include_total_count=True,
+            top=_MAX_SKIP + _PAGE_SIZE,
+            **azure_timeouts(timeout)
+        )
+        pages = results.by_page(continuation_token=continuation_token)
+        for number, page in enumerate(pages):
+            docs = _strip_search_keys(page)
+            if number == 0 and continuation_token is None:
+                total = results.get_count() or 0
+                if total > _MAX_SKIP + _PAGE_SIZE:
+                    raise ValueError(
+                        f"'{index_name}'의 문서 {total}건은 건너뛰기 페이지 조회 상한({_MAX_SKIP + _PAGE_SIZE}건)을 넘습니다 - "
+                        "키가 정렬 가능하지 않은 예전 인덱스라 끝까지 읽을 수 없습니다 (필터로 나눠서 조회하세요)"
+                    )
+            yield docs, pages.continuation_token
+
+# 문서당 첫 청크만 선택 (청크 필드가 없던 예전 레코드 포함)
+_FIRST_CHUNK_FILTER = "chunk_index eq 0 or chunk_index eq null"
+_index_field_cache = {}
+
+def _document_filter(index_name: str) -> Optional[str]:
+    """문서 단위 조회용 필터 - 인덱스에 chunk_index 필드가 있을 때만 적용."""
+    if index_name not in _index_field_cache:
+        try:
+            index = get_search_index_client().get_index(index_name)
+            _index_field_cache[index_name] = {field.name for field in index.fields}
+        except Exception as e:
+            log_exception(f"⚠️  인덱스 스키마 조회 실패 ({index_name}): ", e)
+            return None
+    return _FIRST_CHUNK_FILTER if "chunk_index" in _index_field_cache[index_name] else None
+
+def make_document_id(file_name: str) -> str:
+    """Blob 경로 기반의 안정적인 문서 ID (같은 파일을 다시 올리면 같은 ID)."""
+    blob_path = f"{CONTAINER_NAME}/{file_name}"
+    return hashlib.sha256(blob_path.encode("utf-8")).hexdigest()[:32]
+
+def _odata_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+def _odata_datetime(value) -> str:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _any_of(field: str, values: List[str]) -> str:
+    return "(" + " or ".join(f"{field} eq {_odata_string(value)}" for value in values) + ")"
+
+def build_metadata_filter(filters: Optional[dict]) -> Optional[str]:
+    """검색 필터 dict를 OData 필터 식으로 변환.
+
+    지원 키: owner, file_types, file_names, doc_ids (문자열 또는 목록),
+    uploaded_after, uploaded_before (datetime 또는 ISO 문자열), page_from, page_to
+    """
+    if not filters:
+        return None
+    clauses = []
+    for key, field in (("owner", "owner"), ("file_types", "file_type"),
+                       ("file_names", "file_name"), ("doc_ids", "doc_id")):
+        values = filters.get(key)
+        if not values:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        if key == "file_types":
+            values = [value.lower().lstrip(".") for value in values]
+        clauses.append(_any_of(field, values))
+    if filters.get("uploaded_after"):
+        clauses.append(f"uploaded_at ge {_odata_datetime(filters['uploaded_after'])}")
+    if filters.get("uploaded_before"):
+        clauses.append(f"uploaded_at lt {_odata_datetime(filters['uploaded_before'])}")
+    # 요청한 페이지 구간과 겹치는 청크
+    if filters.get("page_from") is not None:
+        clauses.append(f"page_end ge {int(filters['page_from'])}")
+    if filters.get("page_to") is not None:
+        clauses.append(f"page_start le {int(filters['page_to'])}")
+    return " and ".join(clauses) or None
+
+def _get_stored_chunks(index_name: str, doc_id: str) -> dict:
+    """문서의 현재 청크 목록 {id: {chunk_hash, version}} - 페이지 단위로 끝까지 읽는다."""
+    pages = iter_index_pages(
+        index_name,
+        select=["id", "chunk_hash", "version"],
+        filter_expression=f"doc_id eq {_odata_string(doc_id)}",
     )
+    return {result["id"]: result for page, _ in pages for result in page}
 
-    index = SearchIndex(name=target_index, fields=fields, vector_search=vector_search)
-    index_client.create_index(index)
+def _get_legacy_records(index_name: str, file_name: str) -> List[str]:
+    """doc_id 없이 uuid로 저장된 예전 방식 레코드 ID 목록."""
+    pages = iter_index_pages(
+        index_name,
+        select=["id"],
+        filter_expression=f"file_name eq {_odata_string(file_name)} and doc_id eq null",
+    )
+    return [result["id"] for page, _ in pages for result in page]
+
+def _batched(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _page_range(page_offsets: Optional[List[int]], start: int, length: int) -> dict:
+    """청크의 [start, start + length) 구간이 걸친 페이지 번호 (1부터)."""
+    if not page_offsets:
+        return {}
+    return {
+        "page_start": bisect.bisect_right(page_offsets, start),
+        "page_end": bisect.bisect_right(page_offsets, start + max(length, 1) - 1),
+    }
 
 def add_document_to_index(
     doc_id: str,
     content: str,
     file_name: str,
-    index_name: str = None
-):
+    index_name: str = None,
+    metadata: Optional[dict] = None,
+    page_offsets: Optional[List[int]] = None,
+) -> dict:
+    """문서를 청크 단위로 증분 인덱싱.
+
+    저장된 청크 해시와 비교해 바뀐 청크만 임베딩/업로드하고, 사라진 청크는 일괄 삭제한다.
+    바뀌지 않은 청크는 임베딩 없이 순서, 버전, 메타데이터만 갱신한다.
+    metadata(file_type, owner, uploaded_at, content_hash)는 모든 청크에 기록되고,
+    page_offsets가 있으면 청크마다 page_start/page_end를 계산한다.
+    """
+    index_name = index_name or get_current_index()
     create_index_if_not_exists(index_name)
     search_client = get_search_client(index_name)
 
-    # 긴 문서는 청크로 나누기
-    max_length = 8000
-    if len(content) > max_length:
-        content = content[:max_length]
+    # 청킹/해시는 CPU 프로세스 풀에서 (큰 문서가 같은 워커의 검색/채팅 요청을 막지 않도록)
+    chunks = chunk_document(content, CHUNK_MAX_CHARS, CHUNK_MIN_CHARS)
+    stored = _get_stored_chunks(index_name, doc_id)
+    version = max((item.get("version") or 0 for item in stored.values()), default=0) + 1
 
-    embedding = get_embedding(content)
+    # 청크 ID = 문서 ID + 청크 해시 (+ 같은 내용이 반복되면 순번)
+    records = []
+    occurrences = {}
+    offset = 0
+    doc_metadata = {key: value for key, value in (metadata or {}).items() if value is not None}
+    for chunk_index, (chunk, digest) in enumerate(chunks):
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        records.append({
+            "id": f"{doc_id}_{digest[:24]}_{occurrence}",
+            "doc_id": doc_id,
+            "chunk_index": chunk_index,
+            "chunk_hash": digest,
+            "version": version,
+            "content": chunk,
+            "file_name": file_name,
+            **doc_metadata,
+            **_page_range(page_offsets, offset, len(chunk)),
+        })
+        # 청크를 이어 붙이면 원문과 같으므로 누적 길이가 원문 내 위치
+        offset += len(chunk)
+
+    changed = [record for record in records if record["id"] not in stored]
+    unchanged = [record for record in records if record["id"] in stored]
+    new_ids = {record["id"] for record in records}
+    removed = [chunk_id for chunk_id in stored if chunk_id not in new_ids]
+    if not stored:
+        removed.extend(_get_legacy_records(index_name, file_name))
+
+    if changed:
+        embeddings = get_embeddings([record["content"] for record in changed], priority=PRIORITY_BULK)
+        for record, embedding in zip(changed, embeddings):
+            record[VECTOR_FIELD] = embedding
+        for batch in _batched(changed, _UPLOAD_BATCH_SIZE):
+            search_client.merge_or_upload_documents(batch)
+    if unchanged:
+        # 내용이 같은 청크는 벡터를 다시 만들지 않고 위치/버전/메타데이터만 갱신
+        updates = [
+            {key: value for key, value in r.items() if key not in ("content", "chunk_hash", "doc_id")}
+            for r in unchanged
+        ]
+        for batch in _batched(updates, _UPLOAD_BATCH_SIZE):
+            search_client.merge_documents(batch)
+    if removed:
+        for batch in _batched([{"id": chunk_id} for chunk_id in removed], _UPLOAD_BATCH_SIZE):
+            search_client.delete_documents(batch)
 
-    document = {
-        "id": doc_id,
-        "content": content,
-        "file_name": file_name,
-        "content_vector": embedding
+    stats = {
+        "doc_id": doc_id,
+        "version": version,
+        "chunks": len(records),
+        "embedded": len(changed),
+        "unchanged": len(unchanged),
+        "deleted": len(removed),
     }
+    safe_print(
+        f"🧮 증분 인덱싱 ({file_name} v{version}): 청크 {stats['chunks']}개 중 "
+        f"임베딩 {stats['embedded']}개, 유지 {stats['unchanged']}개, 삭제 {stats['deleted']}개"
+    )
+    return stats
+
+def _search_key(
+    query: str,
+    top_k: int = 3,
+    index_names: Optional[List[str]] = None,
+    filters: Optional[dict] = None,
+    mode: Optional[str] = None,
+    plan: Optional[dict] = None,
+) -> str:
+    return make_key(
+        " ".join(query.split()).lower(), top_k, sorted(index_names or [get_current_index()]), filters or {},
+        mode or SEARCH_DEFAULT_MODE, plan or {},
+    )
 
-    search_client.upload_documents([document])
+def search_index(
+    index_name: str,
+    query: str,
+    mode: str,
+    top: int,
+    filter_expression: Optional[str] = None,
+    query_embedding: Optional[List[float]] = None,
+) -> list:
+    """인덱스 하나에 keyword / vector / hybrid 검색 실행 (mode는 plan_query가 정한 실제 방식)."""
+    vector_queries = None
+    if mode != "keyword":
+        from azure.search.documents.models import VectorizedQuery
 
-def search_documents(query: str, top_k: int = 3, index_names: Optional[List[str]] = None):
-    from azure.search.documents.models import VectorizedQuery
+        vector_queries = [VectorizedQuery(
+            vector=query_embedding if query_embedding is not None else get_embedding(query),
+            k_nearest_neighbors=top,
+            fields=VECTOR_FIELD
+        )]
+    with stage("search") as timeout:
+        # 사전 필터: 조건에 맞는 청크 안에서만 최근접 이웃을 찾아 top을 채운다
+        results = get_search_client(index_name).search(
+            search_text=query if mode != "vector" else None,
+            vector_queries=vector_queries,
+            filter=filter_expression,
+            vector_filter_mode="preFilter" if filter_expression and vector_queries else None,
+            top=top,
+            **azure_timeouts(timeout)
+        )
+        return [
+            {
+                "content": result["content"],
+                "file_name": result["file_name"],
+                "score": result["@search.score"],
+                "index_name": index_name,
+                "page_start": result.get("page_start"),
+                "page_end": result.get("page_end"),
+                "owner": result.get("owner"),
+                "uploaded_at": result.get("uploaded_at"),
+            }
+            for result in results
+        ]
 
-    target_indexes = index_names or [_current_index]
-    query_embedding = get_embedding(query)
+def _search_with_plan(index_name: str, query: str, plan: dict, top_k: int, filters: Optional[dict],
+                      query_embedding: Optional[List[float]]) -> list:
+    # 질의에 파일명이 있으면 해당 파일로 좁혀 먼저 찾고, 없으면 전체에서 검색
+    if plan["file_names"] and not (filters or {}).get("file_names"):
+        scoped_query = query
+        for file_name in plan["file_names"]:
+            scoped_query = scoped_query.replace(file_name, " ")
+        scoped = search_index(
+            index_name, scoped_query.strip() or "*", plan["mode"], top_k,
+            build_metadata_filter({**(filters or {}), "file_names": plan["file_names"]}), query_embedding,
+        )
+        if scoped:
+            return scoped
+    return search_index(
+        index_name, query, plan["mode"], top_k, build_metadata_filter(filters), query_embedding
+    )
+
+@single_flight("search", _search_key)
+def search_documents(
+    query: str,
+    top_k: int = 3,
+    index_names: Optional[List[str]] = None,
+    filters: Optional[dict] = None,
+    mode: Optional[str] = None,
+    plan: Optional[dict] = None,
+):
+    """문서 검색.
+
+    mode: keyword | vector | hybrid | auto (기본 SEARCH_DEFAULT_MODE). auto는 plan_query로
+    방식을 고르며, 키워드 검색이면 임베딩을 호출하지 않는다.
+    plan: 호출한 쪽이 미리 만든 plan_query 결과 - 주면 mode 대신 이 계획대로 검색한다
+    (응답에 보고하는 계획과 실제 실행한 계획이 같도록).
+    filters는 벡터 검색 전에 적용되는 메타데이터 사전 필터 (build_metadata_filter).
+    """
+    target_indexes = index_names or [get_current_index()]
+    plan = plan or plan_query(query, mode or SEARCH_DEFAULT_MODE)
+    query_embedding = get_embedding(query) if plan["embedding"] else None
     docs = []
 
     for index_name in target_indexes:
         try:
-            search_client = get_search_client(index_name)
-            vector_query = VectorizedQuery(
-                vector=query_embedding,
-                k_nearest_neighbors=top_k,
-                fields="content_vector"
-            )
-            results = search_client.search(
-                search_text=query,
-                vector_queries=[vector_query],
-                top=top_k
-            )
-            for result in results:
-                docs.append({
-                    "content": result["content"],
-                    "file_name": result["file_name"],
-                    "score": result["@search.score"],
-                    "index_name": index_name,
-                })
+            docs.extend(_search_with_plan(index_name, query, plan, top_k, filters, query_embedding))
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             log_exception(f"⚠️  인덱스 검색 실패 ({index_name}): ", e)
 
@@ -169,43 +580,78 @@ def search_documents(query: str, top_k: int = 3, index_names: Optional[List[str]
     return docs[:top_k]
 
 
-def list_documents(index_names: Optional[List[str]] = None, top: int = 100) -> list:
-    """AI Search 인덱스의 문서 목록 조회 (content 포함)."""
-    target_indexes = index_names or [_current_index]
+def list_documents(index_names: Optional[List[str]] = None, top: int = 100, skip: int = 0) -> list:
+    """AI Search 인덱스의 문서 목록 조회 (content 포함). skip/top으로 인덱스별 페이지 조회."""
+    target_indexes = index_names or [get_current_index()]
     docs = []
     try:
         for index_name in target_indexes:
             try:
-                search_client = get_search_client(index_name)
-                results = search_client.search(
-                    search_text="*",
-                    include_total_count=True,
-                    top=top
-                )
+                with stage("search") as timeout:
+                    search_client = get_search_client(index_name)
+                    results = list(search_client.search(
+                        search_text="*",
+                        filter=_document_filter(index_name),
+                        include_total_count=True,
+                        top=top,
+                        skip=skip or None,
+                        **azure_timeouts(timeout)
+                    ))
                 for result in results:
                     content = result.get("content", "")
                     docs.append({
-                        "id": result.get("id", ""),
+                        "id": result.get("doc_id") or result.get("id", ""),
                         "file_name": result.get("file_name", "Unknown"),
                         "content": content,
                         "content_length": len(content),
                         "index_name": index_name,
+                        "file_type": result.get("file_type"),
+                        "owner": result.get("owner"),
+                        "uploaded_at": result.get("uploaded_at"),
                     })
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 log_exception(f"⚠️  인덱스 문서 조회 실패 ({index_name}): ", e)
         safe_print(f"📋 API 문서 조회: {len(docs)}개 문서")
         return docs
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         log_exception("❌ 문서 목록 조회 실패: ", e)
         return []
 
-def get_document_count() -> int:
-    """AI Search 인덱스의 총 문서 개수 조회"""
+_FACET_FIELDS = ("owner", "file_type")
+
+def get_metadata_facets(index_names: Optional[List[str]] = None, top: int = 50) -> dict:
+    """필터 선택지용 패싯 - 필드별 {값: 문서 수} (여러 인덱스는 합산)."""
+    target_indexes = index_names or [get_current_index()]
+    facets = {field: {} for field in _FACET_FIELDS}
+    for index_name in target_indexes:
+        try:
+            results = get_search_client(index_name).search(
+                search_text="*",
+                filter=_document_filter(index_name),
+                facets=[f"{field},count:{top}" for field in _FACET_FIELDS],
+                top=0
+            )
+            for field, buckets in (results.get_facets() or {}).items():
+                for bucket in buckets:
+                    value = bucket.get("value")
+                    facets[field][value] = facets[field].get(value, 0) + bucket.get("count", 0)
+        except Exception as e:
+            log_exception(f"⚠️  패싯 조회 실패 ({index_name}): ", e)
+    return facets
+
+def get_document_count(index_name: str = None) -> int:
+    """AI Search 인덱스의 총 문서 개수 조회 (청크가 아닌 문서 단위)"""
     try:
-        search_client = get_search_client()
+        target_index = index_name or get_current_index()
+        search_client = get_search_client(target_index)
         # $count=true로 정확한 문서 개수 조회
         results = search_client.search(
             search_text="*",
+            filter=_document_filter(target_index),
             include_total_count=True,
             top=1
         )
@@ -217,26 +663,22 @@ def get_document_count() -> int:
         return 0
 
 def get_all_documents() -> list:
-    """AI Search 인덱스의 모든 문서 목록 조회"""
+    """AI Search 인덱스의 모든 문서 목록 조회 (문서당 첫 청크, 페이지 단위로 끝까지)"""
     try:
-        search_client = get_search_client()
-        results = search_client.search(
-            search_text="*",
-            include_total_count=True,
-            top=1000  # 최대 1000개 조회
-        )
+        index_name = get_current_index()
+        document_filter = _document_filter(index_name)
+        # 본문은 받지 않고 식별자만 조회 (doc_id가 없던 예전 인덱스는 id가 문서 ID)
+        select = ["id", "file_name"]
+        if "doc_id" in _index_field_cache.get(index_name, ()):
+            select.append("doc_id")
         docs = []
-        for result in results:
-            docs.append({
-                "id": result["id"],
-                "file_name": result.get("file_name", "Unknown"),
-                "content_length": len(result.get("content", ""))
-            })
+        for page, _ in iter_index_pages(index_name, select=select, filter_expression=document_filter):
+            for result in page:
+                docs.append({
+                    "id": result.get("doc_id") or result["id"],
+                    "file_name": result.get("file_name", "Unknown"),
+                })
         safe_print(f"📋 인덱싱된 문서 목록: {len(docs)}개")
-        for doc in docs:
-            safe_print(
-                f"   - {doc['file_name']} (ID: {doc['id']}, 길이: {doc['content_length']})"
-            )
         return docs
     except Exception as e:
         log_exception("⚠️  문서 목록 조회 실패: ", e)
@@ -0,0 +1,214 @@
+"""워커 간 공유 상태 저장소.
+
+uvicorn을 여러 워커로 실행하면 모듈 전역 변수는 워커마다 따로 존재한다.
+현재 선택된 인덱스나 캐시처럼 모든 워커가 같은 값을 봐야 하는 상태는
+이 모듈의 저장소를 통해 읽고 쓴다. 값은 JSON으로 직렬화해 저장한다.
+
+- memory: 프로세스 내부 dict (단일 워커 기본값)
+- sqlite: 같은 호스트의 워커들이 공유하는 SQLite 파일
+- redis : 여러 호스트가 공유하는 Redis 호환 서버
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from app.config import (
+    STATE_BACKEND,
+    STATE_KEY_PREFIX,
+    STATE_REDIS_URL,
+    STATE_SQLITE_PATH,
+)
+from app.utils.logging_utils import safe_print
+
+
+class StateStore:
+    """키-값 공유 저장소 인터페이스. ttl은 초 단위이며 None이면 만료되지 않는다."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryStateStore(StateStore):
+    """프로세스 내부 저장소 - 워커 간 공유되지 않음."""
+
+    def __init__(self, max_items: int = 10000):
+        self._data = {}
+        self._max_items = max_items
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (json.dumps(value, ensure_ascii=False), expires_at)
+            # 용량 초과 시 가장 오래 저장된 항목부터 제거
+            while len(self._data) > self._max_items:
+                del self._data[next(iter(self._data))]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteStateStore(StateStore):
+    """SQLite 파일 기반 저장소 - 같은 호스트의 모든 워커가 공유."""
+
+    # set 호출 N회마다 만료된 항목 정리
+    PURGE_INTERVAL = 500
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 연결은 스레드 간 공유할 수 없으므로 스레드마다 하나씩 연다
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires_at FROM kv WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            conn.execute("DELETE FROM kv WHERE key = ? AND expires_at <= ?", (key, time.time()))
+            conn.commit()
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), expires_at),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_INTERVAL == 0:
+            conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        conn.commit()
+
+    def delete(self, key: str) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+        conn.commit()
+
+
+class RedisStateStore(StateStore):
+    """Redis 호환 서버 기반 저장소 - 여러 호스트의 워커가 공유."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._client.get(key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._client.set(key, json.dumps(value, ensure_ascii=False), ex=ttl or None)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+class _PrefixedStateStore(StateStore):
+    """여러 앱이 같은 저장소를 쓸 때 키 충돌을 막기 위한 접두사 래퍼."""
+
+    def __init__(self, inner: StateStore, prefix: str):
+        self._inner = inner
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._inner.get(self._prefix + key)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._inner.set(self._prefix + key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self._inner.delete(self._prefix + key)
+
+
+_store: Optional[StateStore] = None
+_store_lock = threading.Lock()
+
+
+def _create_state_store() -> StateStore:
+    if STATE_BACKEND == "sqlite":
+        safe_print(f"🗄️  공유 상태 저장소: SQLite ({STATE_SQLITE_PATH})")
+        return SQLiteStateStore(STATE_SQLITE_PATH)
+    if STATE_BACKEND == "redis":
+        safe_print(f"🗄️  공유 상태 저장소: Redis ({STATE_REDIS_URL})")
+        return RedisStateStore(STATE_REDIS_URL)
+    if STATE_BACKEND != "memory":
+        safe_print(f"⚠️  알 수 없는 STATE_BACKEND '{STATE_BACKEND}' - memory 사용")
+    return MemoryStateStore()
+
+
+def is_shared_state() -> bool:
+    """다른 프로세스(서버 워커, CLI)와 상태를 공유하는 백엔드인지 - memory는 현재 프로세스 안에서만 유효."""
+    return STATE_BACKEND in ("sqlite", "redis")
+
+
+def get_state_store() -> StateStore:
+    """설정된 백엔드의 공유 저장소 반환 (프로세스당 하나)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _PrefixedStateStore(_create_state_store(), STATE_KEY_PREFIX)
+    return _store
+
+
+def cache_get(namespace: str, key: str) -> Optional[Any]:
+    """공유 캐시 조회. 저장소 오류는 캐시 미스로 취급한다."""
+    try:
+        return get_state_store().get(f"cache:{namespace}:{key}")
+    except Exception as e:
+        safe_print(f"⚠️  캐시 조회 실패 ({namespace}): {e}")
+        return None
+
+
+def cache_set(namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+    """공유 캐시 저장. 저장소 오류는 무시한다."""
+    try:
+        get_state_store().set(f"cache:{namespace}:{key}", value, ttl)
+    except Exception as e:
+        safe_print(f"⚠️  캐시 저장 실패 ({namespace}): {e}")
@@ -0,0 +1,103 @@
+"""서버 기동 후 백그라운드 워밍업.
+
+SDK import, 클라이언트 생성, DNS 조회/TLS 연결, 인덱스 메타데이터 조회를 첫 요청 전에
+미리 끝내 둔다. /api/ready는 워밍업이 끝난 뒤에만 준비 완료를 응답하므로
+새 레플리카가 차가운 상태로 트래픽을 받지 않는다. 개별 단계가 실패해도 워밍업은
+끝까지 진행하며, 실패한 단계는 첫 요청에서 평소처럼 다시 시도된다.
+"""
+import threading
+import time
+from typing import Callable, Dict
+
+from app.utils.logging_utils import safe_print
+
+_ready = threading.Event()
+_steps: Dict[str, dict] = {}
+_started_at = None
+_finished_at = None
+
+
+def _warm_state_store():
+    from app.services.state_store import get_state_store
+
+    get_state_store().get("warmup")
+
+
+def _warm_search():
+    from app.services.search_service import get_current_index, get_document_count
+
+    # 인덱스 메타데이터(필드 목록)를 캐시하고 인덱스/쿼리 엔드포인트 연결을 연다
+    get_document_count(get_current_index())
+
+
+def _warm_openai():
+    from app.services.openai_service import get_openai_client
+
+    get_openai_client().models.list()
+
+
+def _warm_blob():
+    from app.services.blob_service import ensure_container
+
+    ensure_container()
+
+
+def _warm_cpu_pool():
+    from app.services.cpu_pool import warm_cpu_pool
+
+    # spawn 작업 프로세스 기동(인터프리터 시작 + import)을 첫 대용량 업로드 전에 끝내 둔다
+    warm_cpu_pool()
+
+
+def _warm_document_intelligence():
+    from app.services.document_service import get_document_client
+
+    get_document_client()
+
+
+_WARMUP_STEPS: Dict[str, Callable[[], None]] = {
+    "state_store": _warm_state_store,
+    "search": _warm_search,
+    "openai": _warm_openai,
+    "blob": _warm_blob,
+    "document_intelligence": _warm_document_intelligence,
+    "cpu_pool": _warm_cpu_pool,
+}
+
+
+def _run_warmup():
+    global _finished_at
+    for name, step in _WARMUP_STEPS.items():
+        started = time.perf_counter()
+        try:
+            step()
+            _steps[name] = {"status": "ok"}
+        except Exception as e:
+            _steps[name] = {"status": "failed", "error": str(e)}
+            safe_print(f"⚠️  워밍업 실패 ({name}): {e}")
+        _steps[name]["seconds"] = round(time.perf_counter() - started, 3)
+    _finished_at = time.time()
+    _ready.set()
+    safe_print(f"🔥 워밍업 완료 - {_finished_at - _started_at:.2f}초")
+
+
+def start_warmup() -> None:
+    """워밍업을 백그라운드 스레드에서 시작 (기동을 막지 않음)."""
+    global _started_at
+    if _started_at is not None:
+        return
+    _started_at = time.time()
+    threading.Thread(target=_run_warmup, name="warmup", daemon=True).start()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def get_warmup_status() -> dict:
+    return {
+        "ready": is_ready(),
+        "started_at": _started_at,
+        "finished_at": _finished_at,
+        "steps": dict(_steps),
+    }
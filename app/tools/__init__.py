@@ -0,0 +1 @@
+"""운영/개발용 명령줄 도구 (`python -m app.tools.<이름>`)."""
@@ -0,0 +1,83 @@
+"""인덱스 내보내기/가져오기/복사 (임베딩 재생성 없음).
+
+사용법:
+    python -m app.tools.index_transfer export documents-index backup.jsonl.gz
+    python -m app.tools.index_transfer import backup.jsonl.gz documents-index-restore --select
+    python -m app.tools.index_transfer copy documents-index documents-index-v2 --concurrency 8
+
+내보내기/복사가 중단되면 출력된 토큰을 --resume-token으로 넘겨 이어서 진행한다
+(내보내기는 같은 파일 뒤에 이어 쓴다). 대상 인덱스는 현재 설정된 벡터 프로필로 생성된다.
+--select는 실행 중인 서버와 상태를 공유하는 STATE_BACKEND(sqlite/redis)에서만 쓸 수 있다.
+"""
+import argparse
+import json
+import sys
+
+from app.config import INDEX_TRANSFER_BATCH_SIZE, INDEX_TRANSFER_CONCURRENCY
+from app.services.index_transfer_service import (
+    TransferInterrupted,
+    copy_index,
+    export_index,
+    import_snapshot,
+)
+from app.services.search_service import set_current_index
+from app.services.state_store import is_shared_state
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="인덱스 내보내기/가져오기/복사")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="인덱스를 스냅샷 파일로 저장")
+    export_parser.add_argument("index", help="내보낼 인덱스 이름")
+    export_parser.add_argument("path", help="스냅샷 파일 경로 (.jsonl.gz)")
+    export_parser.add_argument("--resume-token", help="중단된 내보내기를 이어서 진행할 토큰")
+
+    import_parser = commands.add_parser("import", help="스냅샷 파일을 인덱스에 업로드")
+    import_parser.add_argument("path", help="스냅샷 파일 경로")
+    import_parser.add_argument("index", help="대상 인덱스 이름")
+
+    copy_parser = commands.add_parser("copy", help="인덱스를 다른 인덱스로 복사")
+    copy_parser.add_argument("source", help="원본 인덱스 이름")
+    copy_parser.add_argument("target", help="대상 인덱스 이름")
+    copy_parser.add_argument("--resume-token", help="중단된 복사를 이어서 진행할 토큰")
+
+    for sub in (import_parser, copy_parser):
+        sub.add_argument("--batch-size", type=int, default=INDEX_TRANSFER_BATCH_SIZE, help="업로드 배치 크기(문서 수)")
+        sub.add_argument("--concurrency", type=int, default=INDEX_TRANSFER_CONCURRENCY, help="동시에 보내는 배치 수")
+        sub.add_argument("--select", action="store_true", help="완료 후 대상 인덱스를 기본 인덱스로 선택")
+    args = parser.parse_args(argv)
+    if getattr(args, "select", False) and not is_shared_state():
+        # memory 저장소는 이 프로세스 안에만 있어 서버에 반영되지 않는다
+        parser.error("--select는 STATE_BACKEND=sqlite 또는 redis에서만 사용할 수 있습니다 (memory는 서버와 공유되지 않음)")
+
+    try:
+        if args.command == "export":
+            stats = export_index(args.index, args.path, args.resume_token)
+            target = None
+        elif args.command == "import":
+            with open(args.path, "rb") as snapshot:
+                stats = import_snapshot(snapshot, args.index, args.batch_size, args.concurrency)
+            target = args.index
+        else:
+            stats = copy_index(args.source, args.target, args.batch_size, args.concurrency, args.resume_token)
+            target = args.target
+    except TransferInterrupted as e:
+        print(f"❌ 중단됨: {e}")
+        if e.continuation_token:
+            print(f"   이어서 진행하려면 --resume-token {e.continuation_token}")
+        return 1
+    except Exception as e:
+        print(f"❌ 실패: {e}")
+        return 1
+
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    if stats.get("failed"):
+        return 1
+    if target and getattr(args, "select", False):
+        set_current_index(target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""기존 인덱스를 새 벡터 프로필(압축/정밀도/HNSW)의 인덱스로 이전.
+
+사용법:
+    SEARCH_VECTOR_COMPRESSION=scalar SEARCH_VECTOR_TYPE=half \\
+        python -m app.tools.migrate_index documents-index documents-index-v2 --select
+
+target 인덱스는 현재 설정된 프로필로 생성되고, 문서는 임베딩 재생성 없이 벡터 그대로 복사된다.
+--select를 주면 복사 후 target을 기본 인덱스로 선택한다 (실행 중인 서버와 상태를 공유하는
+STATE_BACKEND=sqlite/redis에서만 가능). 이전이 확인되면 source는 직접 삭제한다.
+"""
+import argparse
+import sys
+
+from app.services.index_profiles import get_index_profile
+from app.services.search_service import migrate_index, set_current_index
+from app.services.state_store import is_shared_state
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="인덱스 벡터 프로필 이전")
+    parser.add_argument("source", help="기존 인덱스 이름")
+    parser.add_argument("target", help="새로 만들 인덱스 이름")
+    parser.add_argument("--select", action="store_true", help="복사 후 target을 기본 인덱스로 선택")
+    args = parser.parse_args(argv)
+    if args.select and not is_shared_state():
+        # memory 저장소는 이 프로세스 안에만 있어 서버에 반영되지 않는다
+        parser.error("--select는 STATE_BACKEND=sqlite 또는 redis에서만 사용할 수 있습니다 (memory는 서버와 공유되지 않음)")
+
+    print(f"🚚 {args.source} → {args.target} (프로필: {get_index_profile(args.target)})")
+    try:
+        migrate_index(args.source, args.target)
+    except Exception as e:
+        print(f"❌ 이전 실패: {e}")
+        return 1
+    if args.select:
+        set_current_index(args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
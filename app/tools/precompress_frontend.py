@@ -0,0 +1,83 @@
+"""빌드된 프론트엔드 파일을 미리 gzip/brotli로 압축.
+
+사용법:
+    cd frontend && npm run build
+    python -m app.tools.precompress_frontend [frontend/dist]
+
+각 텍스트 파일 옆에 .gz(항상)와 .br(brotli 패키지가 있을 때)을 만든다.
+압축해도 작아지지 않는 파일은 건너뛴다. 서버는 app/utils/static_files.py에서
+Accept-Encoding에 맞는 변형을 골라 그대로 전송한다.
+"""
+import argparse
+import gzip
+import os
+import sys
+
+from app.config import FRONTEND_DIST_DIR
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".map", ".xml", ".ico", ".wasm")
+MIN_SIZE = 1024
+
+
+def _write_if_smaller(path: str, original_size: int, data: bytes) -> bool:
+    if len(data) >= original_size:
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def precompress(root: str) -> dict:
+    stats = {"files": 0, "gzip": 0, "brotli": 0, "original_bytes": 0, "gzip_bytes": 0}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                continue
+            stats["files"] += 1
+            stats["original_bytes"] += len(data)
+
+            # mtime=0으로 고정해 같은 입력이면 같은 결과(재현 가능한 빌드)
+            gz = gzip.compress(data, compresslevel=9, mtime=0)
+            if _write_if_smaller(path + ".gz", len(data), gz):
+                stats["gzip"] += 1
+                stats["gzip_bytes"] += len(gz)
+            if brotli is not None:
+                br = brotli.compress(data, quality=11)
+                if _write_if_smaller(path + ".br", len(data), br):
+                    stats["brotli"] += 1
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="프론트엔드 빌드 결과물 사전 압축")
+    parser.add_argument("root", nargs="?", default=FRONTEND_DIST_DIR, help="빌드 디렉터리 (기본: frontend/dist)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        print(f"❌ 빌드 디렉터리가 없습니다: {args.root} (먼저 npm run build 실행)")
+        return 1
+    if brotli is None:
+        print("ℹ️  brotli 패키지가 없어 .gz만 생성합니다 (pip install brotli)")
+
+    stats = precompress(args.root)
+    print(
+        f"✅ 압축 완료 - 파일 {stats['files']}개, gzip {stats['gzip']}개, brotli {stats['brotli']}개, "
+        f"{stats['original_bytes']:,} → {stats['gzip_bytes']:,} bytes (gzip)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
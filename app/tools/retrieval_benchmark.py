@@ -0,0 +1,522 @@
+"""검색 품질/지연 벤치마크.
+
+인수인계서 JSON(frontend/handover_sample.json과 같은 형식)에서 섹션별 문서와
+질문 → 정답 문서 쌍(골든셋)을 만들고, 검색 설정별로 recall@k, MRR, 질의 지연을 비교한다.
+기본 골든셋에는 청크 여러 개로 나뉘는 긴 문서(benchmark_data/runbook_golden.json)가 함께 들어가
+청킹 on/off 비교가 의미를 갖는다.
+
+사용법:
+    python -m app.tools.retrieval_benchmark                      # 로컬 대체 백엔드
+    python -m app.tools.retrieval_benchmark --modes hybrid,vector --k 3,5 --rerank both
+    python -m app.tools.retrieval_benchmark --modes auto,hybrid           # auto 검색 계획 비교
+    python -m app.tools.retrieval_benchmark --backend azure      # 실제 Azure AI Search
+    python -m app.tools.retrieval_benchmark --save-golden golden.json
+    python -m app.tools.retrieval_benchmark --golden golden.json --json report.json
+
+- local: BM25(키워드) + 해시 n-gram 벡터(코사인) + RRF(하이브리드)로 Azure 동작을 흉내 낸다.
+  외부 서비스 없이 돌아가므로 청킹/k/재순위 같은 파이프라인 변경 비교에 쓴다.
+- azure: 임시 인덱스(bench-*)를 만들어 실제 인덱싱 파이프라인으로 문서를 넣고 질의한 뒤 삭제한다.
+  --index로 이미 적재된 인덱스를 지정하면 적재/삭제를 건너뛴다. 청킹은 파이프라인 설정을 따른다.
+  질의 임베딩은 공유 캐시를 거치므로 같은 질문의 두 번째 설정부터는 임베딩 지연이 빠진다.
+
+auto 방식은 서비스와 같은 plan_query로 질문마다 실제 방식을 고르며, embed% 열은
+임베딩을 호출한 질문 비율이다. 질문에 파일명이 있으면 두 백엔드 모두 서비스처럼 그 파일로
+좁혀 먼저 찾고, 결과가 없으면 전체에서 찾는다.
+
+골든셋 JSON 형식: {"documents": [{"file_name", "content"}], "queries": [{"query", "relevant": [file_name]}]}
+"""
+import argparse
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import time
+import uuid
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.services.query_planner import SEARCH_MODES, plan_query
+from app.utils.chunking import chunk_text
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_HANDOVER_FILES = (
+    os.path.join(_REPO_ROOT, "frontend", "handover_sample.json"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_data", "handover_example.json"),
+)
+# 인수인계서 골든셋에 더하는 골든셋 (섹션 문서는 짧아 청크가 하나뿐이므로 여러 청크 문서 포함)
+DEFAULT_GOLDEN_FILES = (
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_data", "runbook_golden.json"),
+)
+MODES = SEARCH_MODES
+# 재순위 전에 가져올 후보 배수
+RERANK_CANDIDATES = 4
+
+
+# ============================================================
+# 골든셋
+# ============================================================
+
+def _render(value, indent: str = "") -> str:
+    """인수인계서 값을 "키: 값" 줄 형태의 텍스트로 변환."""
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                lines.append(f"{indent}{key}:")
+                lines.append(_render(item, indent + "  "))
+            else:
+                lines.append(f"{indent}{key}: {item}")
+        return "\n".join(lines)
+    if isinstance(value, list):
+        return "\n".join(_render(item, indent) if isinstance(item, (dict, list)) else f"{indent}- {item}" for item in value)
+    return f"{indent}{value}"
+
+
+# 섹션(또는 목록 항목)별 질문 템플릿 - 항목 필드로 채운다
+_ITEM_QUESTIONS = {
+    "priorities": ("{title} 해결 방안은?", "{title} 마감일"),
+    "teamMembers": ("{name} 팀원의 역할은?",),
+    "ongoingProjects": ("{name} 프로젝트 진행 상황", "{name} 담당자는 누구인가요?"),
+    "resources.docs": ("{name} 문서는 어디에 있나요?",),
+    "resources.systems": ("{name} 사용 방법", "{name} 담당자", "{name}"),
+    "resources.contacts": ("{name} 연락처", "{contact}"),
+}
+_SECTION_QUESTIONS = {
+    "overview": ("인수인계 사유와 업무 배경", "인계자 {transferor[name]} 연락처", "인수자 시작일",
+                 "{transferee[contact]}"),
+    "jobStatus": ("{title}의 주요 책임", "보고 체계는 어떻게 되나요?", "팀 목표"),
+    "stakeholders": ("상급자는 누구인가요?", "외부 이해관계자와 역할"),
+    "risks": ("현재 현안과 위험 요소",),
+    "roadmap": ("단기 계획과 장기 계획",),
+    "checklist": ("남은 인수인계 체크리스트 항목",),
+}
+_ITEM_SECTIONS = {
+    "priorities": ("priorities",),
+    "teamMembers": ("teamMembers",),
+    "ongoingProjects": ("ongoingProjects",),
+    "resources.docs": ("resources", "docs"),
+    "resources.systems": ("resources", "systems"),
+    "resources.contacts": ("resources", "contacts"),
+}
+
+
+def _lookup(data: dict, path: tuple):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _format(template: str, fields: dict) -> Optional[str]:
+    try:
+        return template.format(**fields)
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def golden_set_from_handover(handover: dict, prefix: str) -> dict:
+    """인수인계서 하나를 섹션/항목별 문서와 질문 목록으로 변환."""
+    documents = []
+    queries = []
+
+    def add(file_name: str, title: str, value, templates, fields):
+        documents.append({"file_name": file_name, "content": f"[{title}]\n{_render(value)}\n"})
+        for template in templates:
+            query = _format(template, fields)
+            if query:
+                queries.append({"query": query, "relevant": [file_name]})
+
+    for section, templates in _SECTION_QUESTIONS.items():
+        value = handover.get(section)
+        if value:
+            fields = value if isinstance(value, dict) else {}
+            add(f"{prefix}/{section}.txt", section, value, templates, fields)
+
+    for name, path in _ITEM_SECTIONS.items():
+        items = _lookup(handover, path)
+        if not isinstance(items, list):
+            continue
+        for position, item in enumerate(items, start=1):
+            if isinstance(item, dict):
+                add(f"{prefix}/{name}-{position}.txt", name, item, _ITEM_QUESTIONS[name], item)
+    return {"documents": documents, "queries": queries}
+
+
+def build_golden_set(handover_files) -> dict:
+    """여러 인수인계서 파일로 골든셋 생성. 같은 질문이 여러 문서에서 나오면 정답을 합친다."""
+    documents = []
+    merged: Dict[str, set] = {}
+    for path in handover_files:
+        with open(path, encoding="utf-8") as f:
+            handover = json.load(f)
+        prefix = os.path.splitext(os.path.basename(path))[0]
+        golden = golden_set_from_handover(handover, prefix)
+        documents.extend(golden["documents"])
+        for item in golden["queries"]:
+            merged.setdefault(item["query"], set()).update(item["relevant"])
+    queries = [{"query": query, "relevant": sorted(relevant)} for query, relevant in merged.items()]
+    return {"documents": documents, "queries": queries}
+
+
+def load_golden_set(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f)
+    if not golden.get("documents") or not golden.get("queries"):
+        raise ValueError(f"골든셋에 documents/queries가 없습니다: {path}")
+    return golden
+
+
+def merge_golden_sets(*goldens: dict) -> dict:
+    """골든셋 합치기 - 같은 질문의 정답은 합친다."""
+    documents = []
+    merged: Dict[str, set] = {}
+    for golden in goldens:
+        documents.extend(golden["documents"])
+        for item in golden["queries"]:
+            merged.setdefault(item["query"], set()).update(item["relevant"])
+    queries = [{"query": query, "relevant": sorted(relevant)} for query, relevant in merged.items()]
+    return {"documents": documents, "queries": queries}
+
+
+# ============================================================
+# 로컬 대체 백엔드
+# ============================================================
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def _tokenize(text: str) -> List[str]:
+    """단어 + 한글 단어의 음절 bigram (조사가 붙은 형태도 부분 일치하도록)."""
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _hashed_vector(text: str, dimensions: int) -> Dict[int, float]:
+    """문자 2/3-gram 해시 벡터 (L2 정규화) - 임베딩 모델 대용."""
+    compact = " ".join(text.lower().split())
+    counts = Counter()
+    for n in (2, 3):
+        for i in range(len(compact) - n + 1):
+            counts[zlib.crc32(compact[i:i + n].encode("utf-8")) % dimensions] += 1
+    norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+    return {key: value / norm for key, value in counts.items()}
+
+
+def _rrf(rankings: List[List[int]], k: int = 60) -> List[int]:
+    """Reciprocal Rank Fusion - Azure AI Search 하이브리드 검색과 같은 결합 방식."""
+    scores = Counter()
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] += 1.0 / (k + rank + 1)
+    return [item for item, _ in scores.most_common()]
+
+
+class LocalBackend:
+    """메모리 내 BM25 + 해시 벡터 검색. 청크 단위로 색인하고 (file_name, content) 목록을 반환한다."""
+
+    name = "local"
+
+    def __init__(self, chunking: bool = True, max_chars: int = 2000, min_chars: int = 400,
+                 dimensions: int = 1024, k1: float = 1.2, b: float = 0.75):
+        self.chunking = chunking
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.dimensions = dimensions
+        self.k1 = k1
+        self.b = b
+
+    def load(self, documents: List[dict]) -> None:
+        self.chunks = []
+        for document in documents:
+            pieces = (
+                chunk_text(document["content"], self.max_chars, self.min_chars)
+                if self.chunking else [document["content"]]
+            )
+            self.chunks.extend((document["file_name"], piece) for piece in pieces)
+        self.term_counts = [Counter(_tokenize(content)) for _, content in self.chunks]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        total = len(self.chunks)
+        self.idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5))
+            for term, freq in document_frequency.items()
+        }
+        self.vectors = [_hashed_vector(content, self.dimensions) for _, content in self.chunks]
+
+    def _keyword_ranking(self, query: str) -> List[int]:
+        terms = _tokenize(query)
+        if not terms:
+            # "*"처럼 검색어가 없으면 모든 청크 (Azure의 전체 검색과 같게)
+            return list(range(len(self.chunks)))
+        scores = {}
+        for position, counts in enumerate(self.term_counts):
+            score = 0.0
+            normalizer = self.k1 * (1 - self.b + self.b * self.lengths[position] / (self.average_length or 1))
+            for term in terms:
+                freq = counts.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + normalizer)
+            if score > 0:
+                scores[position] = score
+        return sorted(scores, key=scores.get, reverse=True)
+
+    def _vector_ranking(self, query: str) -> List[int]:
+        query_vector = _hashed_vector(query, self.dimensions)
+        scores = [
+            sum(weight * vector.get(key, 0.0) for key, weight in query_vector.items())
+            for vector in self.vectors
+        ]
+        return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+
+    def _search(self, query: str, mode: str, top: int, file_names: Optional[set] = None) -> List[dict]:
+        if mode == "keyword":
+            ranking = self._keyword_ranking(query)
+        elif mode == "vector":
+            ranking = self._vector_ranking(query)
+        else:
+            ranking = _rrf([self._keyword_ranking(query), self._vector_ranking(query)])
+        if file_names:
+            ranking = [position for position in ranking if self.chunks[position][0] in file_names]
+        return [
+            {"file_name": self.chunks[position][0], "content": self.chunks[position][1]}
+            for position in ranking[:top]
+        ]
+
+    def search(self, query: str, mode: str, top: int) -> List[dict]:
+        plan = plan_query(query, mode)
+        # 서비스(_search_with_plan)와 같이 질의의 파일명으로 먼저 좁혀 찾는다
+        if plan["file_names"]:
+            scoped_query = query
+            for file_name in plan["file_names"]:
+                scoped_query = scoped_query.replace(file_name, " ")
+            scoped = self._search(scoped_query.strip() or "*", plan["mode"], top, set(plan["file_names"]))
+            if scoped:
+                return scoped
+        return self._search(query, plan["mode"], top)
+
+    def close(self) -> None:
+        pass
+
+
+# ============================================================
+# Azure AI Search 백엔드
+# ============================================================
+
+class AzureBackend:
+    """실제 인덱싱 파이프라인(add_document_to_index)과 Azure AI Search로 측정."""
+
+    name = "azure"
+
+    def __init__(self, index_name: Optional[str] = None, keep_index: bool = False):
+        self.index_name = index_name or f"bench-{uuid.uuid4().hex[:8]}"
+        self.preloaded = index_name is not None
+        self.keep_index = keep_index or self.preloaded
+
+    def load(self, documents: List[dict]) -> None:
+        from app.services.search_service import add_document_to_index, make_document_id
+
+        if self.preloaded:
+            return
+        print(f"📥 벤치마크 인덱스 적재: {self.index_name} ({len(documents)}개 문서)")
+        for document in documents:
+            add_document_to_index(
+                make_document_id(document["file_name"]), document["content"],
+                document["file_name"], self.index_name
+            )
+        # 색인 반영 대기 (Azure AI Search는 근실시간)
+        time.sleep(2)
+
+    def search(self, query: str, mode: str, top: int) -> List[dict]:
+        from app.services.openai_service import get_embedding
+        from app.services.search_service import _search_with_plan
+
+        # search_documents와 같은 경로 - 파일명 범위 검색 후 전체 검색, 임베딩은 질문당 한 번
+        plan = plan_query(query, mode)
+        query_embedding = get_embedding(query) if plan["embedding"] else None
+        return _search_with_plan(self.index_name, query, plan, top, None, query_embedding)
+
+    def close(self) -> None:
+        if self.keep_index:
+            return
+        from app.services.search_service import get_search_index_client
+
+        get_search_index_client().delete_index(self.index_name)
+        print(f"🧹 벤치마크 인덱스 삭제: {self.index_name}")
+
+
+# ============================================================
+# 재순위 / 평가
+# ============================================================
+
+def rerank(query: str, candidates: List[dict]) -> List[dict]:
+    """질의어 커버리지 기반 재순위 - 후보 중 질의 토큰을 더 많이, 더 가깝게 포함한 청크를 앞으로."""
+    terms = set(_tokenize(query))
+    if not terms:
+        return candidates
+
+    def score(item):
+        position, candidate = item
+        tokens = _tokenize(candidate["content"])
+        present = terms.intersection(tokens)
+        density = len(present) / (1 + math.log(1 + len(tokens)))
+        # 동점이면 원래 순위 유지
+        return (len(present) / len(terms), density, -position)
+
+    return [candidate for _, candidate in sorted(enumerate(candidates), key=score, reverse=True)]
+
+
+def _unique_documents(results: List[dict]) -> List[str]:
+    """청크 결과를 문서 순위로 변환 (문서의 첫 등장 순위)."""
+    seen = []
+    for result in results:
+        if result["file_name"] not in seen:
+            seen.append(result["file_name"])
+    return seen
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def evaluate(backend, queries: List[dict], mode: str, k: int, use_rerank: bool) -> dict:
+    """한 설정으로 모든 질문을 실행하고 recall@k, MRR@k, 지연(ms) 집계."""
+    recalls, reciprocal_ranks, latencies = [], [], []
+    embedded = 0
+    for item in queries:
+        relevant = set(item["relevant"])
+        embedded += plan_query(item["query"], mode)["embedding"]
+        started = time.perf_counter()
+        # 청크가 문서보다 많으므로 넉넉히 가져와 문서 단위 top-k를 만든다
+        top = k * RERANK_CANDIDATES if use_rerank else k * 2
+        results = backend.search(item["query"], mode, top)
+        if use_rerank:
+            results = rerank(item["query"], results)
+        ranked = _unique_documents(results)[:k]
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        recalls.append(len(relevant.intersection(ranked)) / len(relevant))
+        first_hit = next((rank for rank, name in enumerate(ranked, start=1) if name in relevant), None)
+        reciprocal_ranks.append(1.0 / first_hit if first_hit else 0.0)
+
+    return {
+        "mode": mode,
+        "k": k,
+        "rerank": use_rerank,
+        "queries": len(queries),
+        "recall": statistics.mean(recalls),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "embedding_rate": embedded / len(queries),
+        "latency_p50_ms": statistics.median(latencies),
+        "latency_p95_ms": _percentile(latencies, 95),
+        "latency_mean_ms": statistics.mean(latencies),
+    }
+
+
+def run_benchmark(golden: dict, backend_name: str, modes, ks, rerank_options, chunking_options,
+                  index_name: Optional[str] = None, keep_index: bool = False,
+                  chunk_max_chars: int = 2000, chunk_min_chars: int = 400) -> List[dict]:
+    rows = []
+    for chunking in chunking_options:
+        if backend_name == "local":
+            backend = LocalBackend(chunking=chunking, max_chars=chunk_max_chars, min_chars=chunk_min_chars)
+        else:
+            backend = AzureBackend(index_name=index_name, keep_index=keep_index)
+        try:
+            backend.load(golden["documents"])
+            for mode in modes:
+                for k in ks:
+                    for use_rerank in rerank_options:
+                        row = evaluate(backend, golden["queries"], mode, k, use_rerank)
+                        row["backend"] = backend.name
+                        row["chunking"] = chunking
+                        rows.append(row)
+        finally:
+            backend.close()
+    return rows
+
+
+def format_table(rows: List[dict]) -> str:
+    header = f"{'backend':<8}{'chunk':<7}{'mode':<9}{'k':>3}{'rerank':>8}{'recall@k':>10}{'MRR':>8}{'embed%':>8}{'p50 ms':>9}{'p95 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['backend']:<8}{('on' if row['chunking'] else 'off'):<7}{row['mode']:<9}{row['k']:>3}"
+            f"{('on' if row['rerank'] else 'off'):>8}{row['recall']:>10.3f}{row['mrr']:>8.3f}{row['embedding_rate'] * 100:>7.0f}%"
+            f"{row['latency_p50_ms']:>9.2f}{row['latency_p95_ms']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _on_off(value: str) -> List[bool]:
+    return {"on": [True], "off": [False], "both": [False, True]}[value]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="검색 품질/지연 벤치마크")
+    parser.add_argument("--backend", choices=("local", "azure"), default="local")
+    parser.add_argument("--handover", action="append", help="골든셋을 만들 인수인계서 JSON (여러 번 지정 가능)")
+    parser.add_argument("--golden", help="직접 작성한 골든셋 JSON (지정 시 --handover 무시)")
+    parser.add_argument("--save-golden", help="생성한 골든셋을 파일로 저장 (수정 후 --golden으로 재사용)")
+    parser.add_argument("--modes", default=",".join(MODES), help="keyword,vector,hybrid,auto 중 쉼표 구분")
+    parser.add_argument("--k", default="1,3,5", help="top-k 목록 (쉼표 구분)")
+    parser.add_argument("--rerank", choices=("on", "off", "both"), default="both")
+    parser.add_argument("--chunking", choices=("on", "off", "both"), default="on",
+                        help="local 백엔드 전용 - azure는 파이프라인 청킹 설정을 따름")
+    parser.add_argument("--chunk-max-chars", type=int, default=2000, help="local: 청크 최대 길이")
+    parser.add_argument("--chunk-min-chars", type=int, default=400, help="local: 청크 최소 길이")
+    parser.add_argument("--index", help="azure: 이미 적재된 인덱스 사용 (적재/삭제 생략)")
+    parser.add_argument("--keep-index", action="store_true", help="azure: 임시 인덱스를 지우지 않음")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"알 수 없는 검색 방식: {unknown}")
+    ks = [int(k) for k in args.k.split(",") if k.strip()]
+
+    if args.golden:
+        golden = load_golden_set(args.golden)
+    elif args.handover:
+        golden = build_golden_set(args.handover)
+    else:
+        golden = merge_golden_sets(
+            build_golden_set(DEFAULT_HANDOVER_FILES), *(load_golden_set(path) for path in DEFAULT_GOLDEN_FILES)
+        )
+    print(f"📚 골든셋: 문서 {len(golden['documents'])}개, 질문 {len(golden['queries'])}개")
+    if args.save_golden:
+        with open(args.save_golden, "w", encoding="utf-8") as f:
+            json.dump(golden, f, ensure_ascii=False, indent=2)
+        print(f"💾 골든셋 저장: {args.save_golden}")
+
+    chunking_options = _on_off(args.chunking) if args.backend == "local" else [True]
+    rows = run_benchmark(
+        golden, args.backend, modes, ks, _on_off(args.rerank), chunking_options,
+        index_name=args.index, keep_index=args.keep_index,
+        chunk_max_chars=args.chunk_max_chars, chunk_min_chars=args.chunk_min_chars,
+    )
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"golden": {"documents": len(golden["documents"]), "queries": len(golden["queries"])},
+                       "results": rows}, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
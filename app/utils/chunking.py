@@ -0,0 +1,52 @@
+"""문서 텍스트를 인덱싱용 청크로 나누는 헬퍼.
+
+청크 경계는 문단 내용의 해시로 정한다(content-defined chunking). 고정 길이로 자르면
+앞부분에 한 줄만 추가돼도 뒤의 모든 청크가 바뀌지만, 내용 기준 경계는 수정된
+부분 근처의 청크만 달라지므로 재업로드 시 바뀐 청크만 다시 임베딩할 수 있다.
+"""
+import hashlib
+from typing import List
+
+# 평균적으로 N개 문단마다 한 번 경계가 생기도록 하는 값
+_BOUNDARY_DIVISOR = 4
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _is_boundary(paragraph: str) -> bool:
+    digest = hashlib.md5(paragraph.strip().encode("utf-8")).digest()
+    return digest[0] % _BOUNDARY_DIVISOR == 0
+
+
+def _split_long(paragraph: str, max_chars: int) -> List[str]:
+    return [paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars)]
+
+
+def chunk_text(text: str, max_chars: int = 2000, min_chars: int = 400) -> List[str]:
+    """텍스트를 min_chars 이상 max_chars 이하 청크 목록으로 분할."""
+    if not text:
+        return []
+    if len(text) <= max_chars:
+        return [text]
+
+    paragraphs = []
+    for paragraph in text.splitlines(keepends=True):
+        paragraphs.extend(_split_long(paragraph, max_chars) if len(paragraph) > max_chars else [paragraph])
+
+    chunks = []
+    current = []
+    size = 0
+    for paragraph in paragraphs:
+        if size + len(paragraph) > max_chars and current:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph)
+        if size >= min_chars and paragraph.strip() and _is_boundary(paragraph):
+            chunks.append("".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
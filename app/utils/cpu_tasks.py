@@ -0,0 +1,66 @@
+"""프로세스 풀 작업 프로세스에서 실행되는 CPU 작업.
+
+spawn으로 뜬 작업 프로세스가 이 모듈만 import하므로 SDK/설정 모듈을 가져오지 않는다.
+큰 바이트 입력은 SharedMemory 이름(SharedBuffer)으로 전달되어 복사 없이 읽는다.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, NamedTuple, Tuple, Union
+
+from app.utils.chunking import chunk_hash, chunk_text
+
+
+class SharedBuffer(NamedTuple):
+    """작업 프로세스에 넘기는 공유 메모리 참조 (블록 이름, 데이터 길이)."""
+    name: str
+    size: int
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # 블록 해제(unlink)는 만든 부모 프로세스 담당. spawn 작업 프로세스는 부모의
+    # resource_tracker를 공유하므로 3.12 이하에서 붙을 때의 등록은 중복 등록일 뿐이다.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+@contextmanager
+def open_buffer(data: Union[bytes, SharedBuffer]):
+    """bytes 또는 SharedBuffer를 읽기용 버퍼(bytes/memoryview)로 연다."""
+    if not isinstance(data, SharedBuffer):
+        yield data
+        return
+    shm = _attach(data.name)
+    view = shm.buf[:data.size]
+    try:
+        yield view
+    finally:
+        view.release()
+        shm.close()
+
+
+def decode_text(data: Union[bytes, SharedBuffer]) -> str:
+    """txt 파일 디코딩 - UTF-8 실패 시 cp949로 재시도"""
+    with open_buffer(data) as buffer:
+        try:
+            return str(buffer, "utf-8")
+        except UnicodeDecodeError:
+            return str(buffer, "cp949", "ignore")
+
+
+def chunk_document(text: str, max_chars: int, min_chars: int) -> List[Tuple[str, str]]:
+    """텍스트를 청크로 나누고 청크별 해시를 함께 반환."""
+    return [(chunk, chunk_hash(chunk)) for chunk in chunk_text(text, max_chars, min_chars)]
+
+
+def warm() -> bool:
+    return True
+
+
+def timed(fn: Callable, args: tuple) -> Tuple[Any, float]:
+    """작업 프로세스 안에서 실행 시간을 함께 잰다 (대기 시간과 구분)."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
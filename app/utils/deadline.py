@@ -0,0 +1,176 @@
+"""요청 단위 마감 시간(deadline)과 협조적 취소.
+
+라우터가 요청마다 Deadline을 만들어 작업 스레드로 넘기면(deadline.run), 하위 호출
+(검색, 임베딩, 텍스트 추출, LLM)은 stage()로 단계별 기본 타임아웃과 남은 시간 중
+짧은 값을 외부 호출 타임아웃으로 쓰고, 호출 전후와 대기 중에 취소/만료를 확인한다.
+클라이언트 연결이 끊기면 watch_disconnect가 Deadline을 취소하고, 진행 중인 작업은
+다음 확인 지점에서 DeadlineExceeded로 멈춘다. 예외에는 시간이 다 된 단계 이름이 담긴다.
+
+Deadline 없이 실행되는 작업(대량 업로드, 워밍업, CLI 도구)도 단계별 기본 타임아웃은 적용된다.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from app.config import (
+    TIMEOUT_BLOB,
+    TIMEOUT_EMBEDDING,
+    TIMEOUT_EXTRACTION,
+    TIMEOUT_LLM,
+    TIMEOUT_SEARCH,
+)
+from app.utils.logging_utils import safe_print
+
+STAGE_TIMEOUTS: Dict[str, float] = {
+    "embedding": TIMEOUT_EMBEDDING,
+    "search": TIMEOUT_SEARCH,
+    "llm": TIMEOUT_LLM,
+    "extraction": TIMEOUT_EXTRACTION,
+    "blob": TIMEOUT_BLOB,
+}
+# 연결 수립 타임아웃 상한 (읽기 타임아웃은 단계 타임아웃을 따름)
+_CONNECT_TIMEOUT = 10.0
+# 대기 중 취소 여부를 확인하는 간격
+POLL_INTERVAL = 0.25
+
+
+class DeadlineExceeded(Exception):
+    """요청 마감 시간 초과, 단계 타임아웃 또는 클라이언트 연결 종료로 작업을 멈춘 경우."""
+
+    def __init__(self, stage: str, cancelled: bool = False):
+        if cancelled:
+            message = f"클라이언트 연결이 끊겨 작업을 취소했습니다 ({stage} 단계)"
+        else:
+            message = f"처리 시간이 초과되었습니다 ({stage} 단계)"
+        super().__init__(message)
+        self.stage = stage
+        self.cancelled = cancelled
+
+
+class Deadline:
+    """요청 하나의 남은 시간 예산과 취소 상태."""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.stage = "start"
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self, stage: Optional[str] = None) -> None:
+        """취소되었거나 시간이 다 되었으면 DeadlineExceeded."""
+        stage = stage or self.stage
+        if self._cancelled.is_set():
+            raise DeadlineExceeded(stage, cancelled=True)
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(stage)
+
+    def sleep(self, seconds: float, stage: Optional[str] = None) -> None:
+        """취소되면 즉시 깨어나는 sleep. 남은 시간보다 길면 기다리지 않고 DeadlineExceeded."""
+        if seconds >= self.remaining():
+            raise DeadlineExceeded(stage or self.stage)
+        self._cancelled.wait(seconds)
+        self.check(stage)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """fn을 스레드 풀에서 이 Deadline을 현재 값으로 두고 실행."""
+        return await run_in_threadpool(_run_in_scope, self, fn, args, kwargs)
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("deadline", default=None)
+
+
+def _run_in_scope(deadline: Deadline, fn: Callable, args: tuple, kwargs: dict) -> Any:
+    token = _current.set(deadline)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def check_deadline(stage: str) -> None:
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def stage_timeout(stage: str) -> float:
+    """단계 기본 타임아웃과 요청의 남은 시간 중 짧은 값 (이미 만료/취소면 DeadlineExceeded)."""
+    timeout = STAGE_TIMEOUTS[stage]
+    deadline = _current.get()
+    if deadline is None:
+        return timeout
+    deadline.check(stage)
+    deadline.stage = stage
+    return max(0.1, min(timeout, deadline.remaining()))
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """SDK별 타임아웃 예외 (openai.APITimeoutError, azure ServiceResponseTimeoutError, httpx 등)."""
+    return isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+
+@contextmanager
+def stage(name: str):
+    """단계 실행 구간 - 이 단계 호출에 쓸 타임아웃(초)을 넘겨주고, SDK 타임아웃은 DeadlineExceeded로 바꾼다."""
+    timeout = stage_timeout(name)
+    try:
+        yield timeout
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        if is_timeout_error(e):
+            raise DeadlineExceeded(name) from e
+        raise
+
+
+def azure_timeouts(timeout: float) -> dict:
+    """Azure SDK 호출별 전송 타임아웃 인자."""
+    return {"connection_timeout": min(timeout, _CONNECT_TIMEOUT), "read_timeout": timeout}
+
+
+def watch_disconnect(request: Request, deadline: Deadline) -> "asyncio.Task":
+    """클라이언트 연결 종료를 감시해 Deadline을 취소하는 태스크 (요청 처리 후 cancel())."""
+
+    async def watch():
+        while not deadline.cancelled and deadline.remaining() > 0:
+            if await request.is_disconnected():
+                safe_print(f"🔌 클라이언트 연결 종료 - 진행 중인 작업 취소 ({deadline.stage} 단계)")
+                deadline.cancel()
+                return
+            await asyncio.sleep(POLL_INTERVAL * 2)
+
+    return asyncio.create_task(watch())
+
+
+def deadline_http_error(error: DeadlineExceeded, request_id: Optional[str] = None) -> HTTPException:
+    """타임아웃은 504, 클라이언트 연결 종료는 499(응답을 받을 클라이언트는 없음)."""
+    suffix = f" (request_id={request_id})" if request_id else ""
+    if error.cancelled:
+        safe_print(f"🛑 요청 취소: {error}{suffix}")
+        return HTTPException(status_code=499, detail=f"{error}{suffix}")
+    safe_print(f"⌛ 요청 시간 초과: {error}{suffix}")
+    return HTTPException(
+        status_code=504,
+        detail=f"{error}{suffix}",
+        headers={"X-Deadline-Stage": error.stage},
+    )
@@ -0,0 +1,78 @@
+"""인수인계서 JSON 스키마 - 프론트엔드 HandoverData 형식의 기본 구조와 검증.
+
+LLM 응답의 섹션이 빠졌거나 형식이 다르면(객체 자리에 문자열 등) 기본값으로 채워
+프론트엔드 편집 화면이 항상 완전한 구조를 받도록 한다.
+"""
+import copy
+from typing import Any
+
+# 섹션 순서 = 프롬프트의 응답 형식 순서 (스트리밍 시 이 순서로 도착)
+_DEFAULTS = {
+    "overview": {
+        "transferor": {"name": "", "position": "", "contact": ""},
+        "transferee": {"name": "", "position": "", "contact": "", "startDate": ""},
+        "reason": "",
+        "background": "",
+        "period": "",
+        "schedule": [],
+    },
+    "jobStatus": {
+        "title": "",
+        "responsibilities": [],
+        "authority": "",
+        "reportingLine": "",
+        "teamMission": "",
+        "teamGoals": [],
+    },
+    "priorities": [],
+    "stakeholders": {"manager": "", "internal": [], "external": []},
+    "teamMembers": [],
+    "ongoingProjects": [],
+    "risks": {"issues": "", "risks": ""},
+    "roadmap": {"shortTerm": "", "longTerm": ""},
+    "resources": {"docs": [], "systems": [], "contacts": []},
+    "checklist": [],
+}
+
+HANDOVER_SECTIONS = tuple(_DEFAULTS)
+
+
+def empty_handover() -> dict:
+    """모든 섹션이 빈 값인 인수인계서."""
+    return copy.deepcopy(_DEFAULTS)
+
+
+def _merge(default: Any, value: Any) -> Any:
+    if isinstance(default, dict):
+        if not isinstance(value, dict):
+            return copy.deepcopy(default)
+        merged = dict(value)
+        for key, default_value in default.items():
+            merged[key] = _merge(default_value, value.get(key))
+        return merged
+    if isinstance(default, list):
+        return value if isinstance(value, list) else []
+    # 문자열 필드: 없으면 "", 숫자 등은 그대로 두되 None/객체는 빈 문자열
+    if value is None or isinstance(value, (dict, list)):
+        return default
+    return value
+
+
+def validate_section(name: str, value: Any) -> Any:
+    """섹션 하나를 기본 구조에 맞춘다 (알 수 없는 섹션은 그대로)."""
+    if name not in _DEFAULTS:
+        return value
+    section = _merge(_DEFAULTS[name], value)
+    if isinstance(section, list):
+        # 목록 섹션은 객체 항목만 유지
+        section = [item for item in section if isinstance(item, dict)]
+    return section
+
+
+def finalize_handover(result: Any) -> dict:
+    """최종 스키마 검증 - 모든 섹션을 채우고 추가 키(rawContent 등)는 유지."""
+    result = result if isinstance(result, dict) else {}
+    handover = {name: validate_section(name, result.get(name)) for name in HANDOVER_SECTIONS}
+    for key, value in result.items():
+        handover.setdefault(key, value)
+    return handover
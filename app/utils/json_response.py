@@ -0,0 +1,31 @@
+"""API 기본 JSON 응답 클래스.
+
+orjson이 설치되어 있으면 orjson으로 직렬화한다. 표준 json보다 수 배 빨라
+추출 텍스트나 인수인계서 JSON처럼 큰 응답에서 차이가 크다.
+orjson이 없거나 지원하지 않는 값이 있으면 표준 json으로 대체한다.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                pass
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
@@ -0,0 +1,72 @@
+"""스트리밍으로 들어오는 JSON 객체의 최상위 항목을 완성되는 순서대로 꺼내는 점진 파서.
+
+LLM JSON 모드 응답을 조각(delta)마다 feed()하면, 최상위 객체의 "키": 값 쌍이 끝난
+시점(다음 ',' 또는 닫는 '}'를 만난 시점)에 (키, 값)을 돌려준다. 문자열 안의 괄호/쉼표와
+이스케이프는 건너뛰며, 이미 읽은 부분은 다시 훑지 않는다.
+"""
+import json
+from typing import Any, List, Tuple
+
+
+class JsonObjectStream:
+    """최상위 JSON 객체의 멤버 단위 점진 파서."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = None
+        self.complete = False
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """새 조각을 추가하고, 이번에 완성된 최상위 (키, 값) 목록을 반환."""
+        self._buffer += text
+        members = []
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            ch = buffer[pos]
+            if self.complete:
+                break
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = pos + 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._take_member(pos))
+                    self.complete = True
+            elif ch == "," and self._depth == 1:
+                members.extend(self._take_member(pos))
+                self._member_start = pos + 1
+        self._pos = len(buffer)
+        return members
+
+    def _take_member(self, end: int) -> List[Tuple[str, Any]]:
+        if self._member_start is None:
+            return []
+        member = self._buffer[self._member_start:end].strip()
+        if not member:
+            return []
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            # 형식이 깨진 항목은 건너뛰고, 최종 전체 파싱에서 다시 판단
+            return []
+        return list(parsed.items())
@@ -0,0 +1,113 @@
+"""동시에 들어온 동일 요청을 하나의 업스트림 호출로 합치는 single-flight 헬퍼.
+
+같은 키로 이미 실행 중인 호출이 있으면 새 호출자는 그 결과를 기다렸다가 공유한다.
+선행 호출이 예외로 끝나면 기다리던 호출자 모두에게 같은 예외가 전달된다.
+단, 선행 호출자의 요청이 취소되었거나 마감 시간을 넘겨 멈춘 경우(DeadlineExceeded)는
+대기자와 무관하므로 대기자가 직접 다시 실행한다. 대기자도 자기 요청의 마감/취소를 따른다.
+"""
+import copy
+import functools
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict
+
+from app.utils.deadline import POLL_INTERVAL, DeadlineExceeded, current_deadline
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+        self.retried = 0
+
+    def _wait(self, call: _Call) -> None:
+        deadline = current_deadline()
+        if deadline is None:
+            call.done.wait()
+            return
+        while not call.done.wait(POLL_INTERVAL):
+            deadline.check()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.waiters += 1
+                    self.shared += 1
+                    leader = False
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    self.executed += 1
+                    leader = True
+
+            if leader:
+                break
+            self._wait(call)
+            if isinstance(call.error, DeadlineExceeded):
+                # 선행 호출자 쪽 취소/시간 초과 - 결과가 없으므로 직접 다시 실행
+                with self._lock:
+                    self.retried += 1
+                continue
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        # 대기자가 원본을 복사하는 동안 호출자가 결과를 수정하지 않도록 분리
+        return copy.deepcopy(call.result) if call.waiters else call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"executed": self.executed, "shared": self.shared, "retried": self.retried, "in_flight": in_flight}
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def make_key(*parts: Any) -> str:
+    """인자들을 정규화된 JSON으로 직렬화한 뒤 해시해 키로 사용."""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def single_flight(name: str, key_fn: Callable[..., str]):
+    """함수 인자로 key_fn(*args, **kwargs) 키를 만들어 동시 호출을 합치는 데코레이터."""
+    group = SingleFlight(name)
+    _groups[name] = group
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return group.do(key_fn(*args, **kwargs), lambda: fn(*args, **kwargs))
+
+        wrapper.single_flight = group
+        return wrapper
+
+    return decorator
+
+
+def get_single_flight_stats() -> dict:
+    return {name: group.stats() for name, group in _groups.items()}
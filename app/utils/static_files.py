@@ -0,0 +1,74 @@
+"""빌드된 프론트엔드 정적 파일 제공.
+
+- 미리 압축된 .br/.gz 파일이 있으면 Accept-Encoding에 맞춰 그대로 전송
+- ETag/If-None-Match로 변경되지 않은 파일은 304 응답
+- 파일명에 해시가 붙은 assets/ 아래 파일은 1년 immutable 캐시, index.html은 매번 재검증
+
+압축 파일은 `python -m app.tools.precompress_frontend`로 빌드 후 생성한다.
+"""
+import mimetypes
+import os
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# (Accept-Encoding 토큰, 파일 확장자) - 앞쪽이 우선
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings(request: Request) -> set:
+    header = request.headers.get("accept-encoding", "")
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def _etag(stat_result: os.stat_result, encoding: Optional[str]) -> str:
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}{suffix}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def resolve_static_path(root: str, relative_path: str) -> str:
+    """root 밖을 가리키는 경로(../ 등)는 404."""
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, relative_path))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return path
+
+
+def static_file_response(request: Request, path: str, cache_control: str) -> Response:
+    """압축 변형 선택 + ETag + Cache-Control이 적용된 파일 응답."""
+    accepted = _accepted_encodings(request)
+    chosen_path, encoding = path, None
+    for token, extension in _ENCODINGS:
+        if token in accepted and os.path.isfile(path + extension):
+            chosen_path, encoding = path + extension, token
+            break
+
+    stat_result = os.stat(chosen_path)
+    etag = _etag(stat_result, encoding)
+    headers = {"Cache-Control": cache_control, "ETag": etag, "Vary": "Accept-Encoding"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return FileResponse(chosen_path, media_type=media_type, headers=headers, stat_result=stat_result)
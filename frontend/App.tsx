@@ -11,7 +11,7 @@ import {
   ChatSession,
 } from "./types";
 import {
-  analyzeFilesForHandover,
+  analyzeFilesForHandoverStream,
   chatWithGemini,
 } from "./services/geminiService";
 
@@ -108,8 +108,9 @@ const App: React.FC = () => {
     setIsProcessing(true);
 
     // 새 세션 생성 (현재 세션이 없을 경우)
+    const sessionId = currentSessionId || Date.now().toString();
     if (!currentSessionId) {
-      const newSessionId = Date.now().toString();
+      const newSessionId = sessionId;
       const newSession: ChatSession = {
         id: newSessionId,
         title: text.substring(0, 30) + (text.length > 30 ? "..." : ""),
@@ -135,7 +136,12 @@ const App: React.FC = () => {
     }
 
     try {
-      const responseText = await chatWithGemini(text, files, updatedMessages);
+      const responseText = await chatWithGemini(
+        text,
+        files,
+        updatedMessages,
+        sessionId
+      );
       const aiMsg: ChatMessage = { role: "assistant", text: responseText };
       const finalMessages = [...updatedMessages, aiMsg];
       setMessages(finalMessages);
@@ -143,7 +149,7 @@ const App: React.FC = () => {
       // 세션에 AI 응답 메시지 추가
       setChatSessions((prev) =>
         prev.map((session) =>
-          session.id === currentSessionId
+          session.id === sessionId
             ? {
                 ...session,
                 messages: finalMessages,
@@ -227,7 +233,11 @@ const App: React.FC = () => {
       }
 
       console.log("📊 인수인계서 분석 시작...", filesToAnalyze);
-      const data = await analyzeFilesForHandover(filesToAnalyze);
+      // 섹션이 완성되는 대로 리포트에 먼저 표시하고, 마지막에 검증된 전체 결과로 교체
+      const data = await analyzeFilesForHandoverStream(
+        filesToAnalyze,
+        setHandoverData
+      );
       console.log("✅ 분석 완료:", data);
       setHandoverData(data);
       setMessages((prev) => [
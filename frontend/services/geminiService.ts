@@ -147,11 +147,9 @@ function decodeBase64(base64String: string): string {
 }
 
 /**
- * [분석] 인수인계서 생성
+ * 분석 요청 페이로드 (일반/스트리밍 공통)
  */
-export const analyzeFilesForHandover = async (
-  files: SourceFile[]
-): Promise<HandoverData> => {
+const buildAnalyzePayload = (files: SourceFile[]) => {
   // 파일 내용을 텍스트로 변환 (텍스트 파일 직접 사용)
   const fileContext = files
     .map((f) => {
@@ -176,6 +174,16 @@ export const analyzeFilesForHandover = async (
     ],
     response_format: { type: "json_object" },
   };
+  return payload;
+};
+
+/**
+ * [분석] 인수인계서 생성
+ */
+export const analyzeFilesForHandover = async (
+  files: SourceFile[]
+): Promise<HandoverData> => {
+  const payload = buildAnalyzePayload(files);
 
   try {
     console.log("🔍 analyzeFilesForHandover 호출 - 파일수:", files.length);
@@ -222,13 +230,88 @@ export const analyzeFilesForHandover = async (
   }
 };
 
+/**
+ * [분석] 인수인계서 생성 - 스트리밍 (/api/analyze/stream, Server-Sent Events)
+ * start 이벤트로 빈 구조를, 이후 섹션이 완성될 때마다 onUpdate로 중간 결과를 넘기고
+ * 최종 스키마 검증을 마친 결과를 반환합니다.
+ */
+export const analyzeFilesForHandoverStream = async (
+  files: SourceFile[],
+  onUpdate: (data: HandoverData) => void
+): Promise<HandoverData> => {
+  const url = `${CONFIG.LOCAL_BACKEND_URL}/api/analyze/stream`;
+  console.log("🔍 analyzeFilesForHandoverStream 호출 - 파일수:", files.length);
+
+  const response = await fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(buildAnalyzePayload(files)),
+    mode: "cors",
+  });
+  if (!response.ok || !response.body) {
+    const errorText = await response.text();
+    throw new Error(`API 에러 (${response.status}): ${errorText}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let current: HandoverData | null = null;
+
+  // 이벤트 하나 처리 - done이면 최종 결과 반환
+  const handleEvent = (block: string): HandoverData | null => {
+    let event = "message";
+    const dataLines: string[] = [];
+    for (const line of block.split("\n")) {
+      if (line.startsWith("event:")) event = line.slice(6).trim();
+      else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim());
+    }
+    if (dataLines.length === 0) return null;
+    const data = JSON.parse(dataLines.join("\n"));
+
+    if (event === "start") {
+      current = data.content as HandoverData;
+      onUpdate(current);
+    } else if (event === "section" && current) {
+      console.log("🧩 섹션 수신:", data.name);
+      current = { ...current, [data.name]: data.value } as HandoverData;
+      onUpdate(current);
+    } else if (event === "done") {
+      console.log("✅ 스트리밍 분석 완료:", data.request_id);
+      return data.content as HandoverData;
+    } else if (event === "error") {
+      throw new Error(`API 에러 (${data.status}): ${data.detail}`);
+    }
+    return null;
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let separator = buffer.indexOf("\n\n");
+    while (separator !== -1) {
+      const result = handleEvent(buffer.slice(0, separator));
+      buffer = buffer.slice(separator + 2);
+      if (result) {
+        reader.cancel();
+        return result;
+      }
+      separator = buffer.indexOf("\n\n");
+    }
+  }
+  throw new Error("스트리밍 응답이 완료되지 않았습니다.");
+};
+
 /**
  * [채팅] 지능형 상담
+ * conversationId: 채팅 세션 ID - 백엔드가 세션별 이전 대화 요약을 캐시하는 키
  */
 export const chatWithGemini = async (
   message: string,
   files: SourceFile[],
-  history: { role: string; text: string }[]
+  history: { role: string; text: string }[],
+  conversationId?: string
 ): Promise<string> => {
   const payload = {
     messages: [
@@ -239,6 +322,7 @@ export const chatWithGemini = async (
       })),
       { role: "user", content: message },
     ],
+    conversation_id: conversationId,
   };
 
   // 채팅은 텍스트 응답이므로 직접 fetch 호출
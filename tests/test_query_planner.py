@@ -0,0 +1,39 @@
+import pytest
+
+from app.services.query_planner import plan_query
+
+
+@pytest.mark.parametrize("query, file_name", [
+    ("인수인계.pdf의 요약해줘", "인수인계.pdf"),
+    ("월간보고서.xlsx에서 매출 알려줘", "월간보고서.xlsx"),
+    ("handover.docx 내용", "handover.docx"),
+])
+def test_file_name_with_particle(query, file_name):
+    plan = plan_query(query)
+    assert plan["mode"] == "keyword"
+    assert plan["reason"] == "file_name"
+    assert plan["file_names"] == [file_name]
+
+
+@pytest.mark.parametrize("query", [
+    "DATA-123의 담당자는?",
+    "A12345님 연락처",
+    "EMP-2024-001 김철수 연락처",
+])
+def test_identifier_with_particle(query):
+    plan = plan_query(query)
+    assert (plan["mode"], plan["reason"]) == ("keyword", "identifier")
+
+
+@pytest.mark.parametrize("query", [
+    "gpt-4o 모델 설정 방법",
+    "text-embedding-ada-002 사용 이유가 뭐야?",
+    "2025년 하반기 프로젝트 일정 알려줘",
+])
+def test_natural_language_with_identifier_stays_hybrid(query):
+    assert plan_query(query)["mode"] == "hybrid"
+
+
+def test_explicit_mode_is_kept():
+    plan = plan_query("DATA-123", "vector")
+    assert (plan["mode"], plan["embedding"]) == ("vector", True)